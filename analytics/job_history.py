@@ -0,0 +1,160 @@
+"""
+Columnar job history store for analytics.
+
+Appends every scrape to a Parquet dataset partitioned by scrape date and
+source, with dictionary-encoded low-cardinality columns, so trend queries
+read only the columns and partitions they need.
+"""
+
+import logging
+import uuid
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = pa.schema([
+    ('job_id', pa.string()),
+    ('title', pa.dictionary(pa.int32(), pa.string())),
+    ('company', pa.dictionary(pa.int32(), pa.string())),
+    ('location', pa.dictionary(pa.int32(), pa.string())),
+    ('salary', pa.string()),
+    ('posted_date', pa.string()),
+    ('url', pa.string()),
+    ('skills', pa.list_(pa.string())),
+    ('scrape_date', pa.string()),
+    ('source', pa.string()),
+])
+
+PARTITIONING = ds.partitioning(
+    pa.schema([('scrape_date', pa.string()), ('source', pa.string())]), flavor='hive'
+)
+
+
+def _skills(value: Any) -> Optional[List[str]]:
+    if isinstance(value, list):
+        return [str(skill) for skill in value]
+    if isinstance(value, str):
+        return [skill.strip() for skill in value.split(',') if skill.strip()]
+    return None
+
+
+class JobHistoryStore:
+    """Append-only Parquet history partitioned by scrape_date and source."""
+
+    def __init__(self, root: Optional[Path] = None, batch_size: int = 50000):
+        """
+        Initialize the history store.
+
+        Args:
+            root: Dataset directory (default: output/history)
+            batch_size: Records converted to Arrow per write
+        """
+        self.root = Path(root) if root else Path(__file__).parent.parent / "output" / "history"
+        self.batch_size = batch_size
+        self.logger = logger
+
+    def append(self, jobs: Iterable[Dict[str, Any]], scrape_date: Optional[str] = None,
+               default_source: str = 'unknown') -> int:
+        """
+        Append one scrape to the history.
+
+        Records are converted in batches, so a lazy reader such as
+        iter_jsonl can be passed without loading the crawl into memory.
+
+        Args:
+            jobs: Job dictionaries
+            scrape_date: ISO date of the scrape (default: today)
+            default_source: Source for records without a 'source' field
+
+        Returns:
+            Number of records written
+        """
+        scrape_date = scrape_date or date.today().isoformat()
+        run_id = uuid.uuid4().hex
+        written = 0
+        batch: List[Dict[str, Any]] = []
+
+        for job in jobs:
+            batch.append(job)
+            if len(batch) >= self.batch_size:
+                written += self._write(batch, scrape_date, default_source, run_id, written)
+                batch = []
+        if batch:
+            written += self._write(batch, scrape_date, default_source, run_id, written)
+
+        self.logger.info(f"Appended {written} jobs to history for {scrape_date}")
+        return written
+
+    def _write(self, batch: List[Dict[str, Any]], scrape_date: str,
+               default_source: str, run_id: str, offset: int) -> int:
+        columns = {name: [] for name in SCHEMA.names}
+        for job in batch:
+            for name in ('job_id', 'title', 'company', 'location', 'salary',
+                         'posted_date', 'url'):
+                value = job.get(name)
+                columns[name].append(None if value is None else str(value))
+            columns['skills'].append(_skills(job.get('skills')))
+            columns['scrape_date'].append(scrape_date)
+            columns['source'].append(str(job.get('source') or default_source))
+
+        table = pa.Table.from_pydict(columns, schema=SCHEMA)
+        ds.write_dataset(
+            table, self.root, format='parquet', partitioning=PARTITIONING,
+            basename_template=f"part-{run_id}-{offset}-{{i}}.parquet",
+            existing_data_behavior='overwrite_or_ignore',
+        )
+        return table.num_rows
+
+    def dataset(self) -> ds.Dataset:
+        """Open the history as a pyarrow dataset."""
+        return ds.dataset(self.root, format='parquet', partitioning=PARTITIONING)
+
+    def _filter(self, start_date: Optional[str], end_date: Optional[str],
+                sources: Optional[List[str]]):
+        expr = None
+        for condition in (
+            ds.field('scrape_date') >= start_date if start_date else None,
+            ds.field('scrape_date') <= end_date if end_date else None,
+            ds.field('source').isin(sources) if sources else None,
+        ):
+            if condition is not None:
+                expr = condition if expr is None else expr & condition
+        return expr
+
+    def scan(self, columns: Optional[List[str]] = None, start_date: Optional[str] = None,
+             end_date: Optional[str] = None, sources: Optional[List[str]] = None) -> pa.Table:
+        """
+        Read selected columns from matching partitions.
+
+        Partition filters prune whole directories, and only the requested
+        columns are decoded.
+
+        Args:
+            columns: Columns to read (default: all)
+            start_date: Inclusive ISO start date
+            end_date: Inclusive ISO end date
+            sources: Restrict to these sources
+
+        Returns:
+            pyarrow Table
+        """
+        if not self.root.exists():
+            return SCHEMA.empty_table().select(columns) if columns else SCHEMA.empty_table()
+        return self.dataset().to_table(
+            columns=columns, filter=self._filter(start_date, end_date, sources)
+        )
+
+    def iter_batches(self, columns: Optional[List[str]] = None, start_date: Optional[str] = None,
+                     end_date: Optional[str] = None,
+                     sources: Optional[List[str]] = None) -> Iterator[pa.RecordBatch]:
+        """Stream selected columns batch by batch (same arguments as scan)."""
+        if not self.root.exists():
+            return
+        yield from self.dataset().to_batches(
+            columns=columns, filter=self._filter(start_date, end_date, sources)
+        )
@@ -0,0 +1,231 @@
+"""
+Taxonomy-driven skill extraction from free-text job descriptions.
+
+Builds an Aho-Corasick automaton over every skill alias, so each
+description is scanned once regardless of how many skills the taxonomy
+holds. Aliases map to a canonical skill name ("k8s" -> "Kubernetes").
+Short aliases that are also ordinary words ("go", "react", "ml") are only
+matched in listed-skill fields, never in free text.
+"""
+
+import json
+import logging
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TAXONOMY: Dict[str, List[str]] = {
+    'Python': ['python', 'python3'],
+    'Java': ['java'],
+    'JavaScript': ['javascript', 'js', 'ecmascript'],
+    'TypeScript': ['typescript', 'ts'],
+    'Go': ['golang', 'go'],
+    'Rust': ['rust'],
+    'C++': ['c++', 'cpp'],
+    'C#': ['c#', 'csharp', '.net'],
+    'SQL': ['sql'],
+    'PostgreSQL': ['postgresql', 'postgres', 'psql'],
+    'MySQL': ['mysql'],
+    'MongoDB': ['mongodb', 'mongo'],
+    'Redis': ['redis'],
+    'Kubernetes': ['kubernetes', 'k8s'],
+    'Docker': ['docker'],
+    'AWS': ['aws', 'amazon web services'],
+    'GCP': ['gcp', 'google cloud'],
+    'Azure': ['azure'],
+    'Terraform': ['terraform'],
+    'Spark': ['spark', 'pyspark', 'apache spark'],
+    'Kafka': ['kafka', 'apache kafka'],
+    'Airflow': ['airflow', 'apache airflow'],
+    'React': ['react', 'reactjs', 'react.js'],
+    'Node.js': ['node.js', 'nodejs', 'node'],
+    'Machine Learning': ['machine learning', 'ml'],
+    'PyTorch': ['pytorch'],
+    'TensorFlow': ['tensorflow'],
+    'Linux': ['linux'],
+    'Git': ['git'],
+}
+
+# Aliases (and canonical names) that are common English words or
+# abbreviations in descriptions ("go-to-market", "on the go", "node"); they
+# still normalize listed skills such as "Go" or "React"
+LISTED_ONLY_ALIASES: FrozenSet[str] = frozenset({
+    'go', 'js', 'ts', 'node', 'spark', 'react', 'ml',
+})
+
+
+def load_taxonomy(path) -> Dict[str, List[str]]:
+    """
+    Load a taxonomy from a JSON file mapping canonical names to alias lists.
+
+    Args:
+        path: JSON file path
+
+    Returns:
+        Taxonomy dictionary
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class SkillExtractor:
+    """Multi-pattern skill matcher over a normalized taxonomy."""
+
+    def __init__(self, taxonomy: Optional[Dict[str, List[str]]] = None,
+                 listed_only: Optional[Iterable[str]] = None):
+        """
+        Build the automaton.
+
+        Args:
+            taxonomy: Mapping of canonical skill to aliases (default:
+                DEFAULT_TAXONOMY); the canonical name is always an alias
+            listed_only: Aliases matched only by ``normalize``, not in free
+                text (default: LISTED_ONLY_ALIASES)
+        """
+        self.taxonomy = taxonomy or DEFAULT_TAXONOMY
+        self.listed_only = frozenset(
+            a.lower() for a in (LISTED_ONLY_ALIASES if listed_only is None else listed_only)
+        )
+        # Trie as parallel lists: goto transitions, failure links, outputs
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[tuple]] = [[]]
+
+        for canonical, aliases in self.taxonomy.items():
+            for alias in {canonical.lower(), *(a.lower() for a in aliases)}:
+                self._add(alias, canonical, alias in self.listed_only)
+        self._build_failure_links()
+
+    def _add(self, alias: str, canonical: str, listed_only: bool):
+        state = 0
+        for char in alias:
+            nxt = self._goto[state].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][char] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append((len(alias), canonical, listed_only))
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(char, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def extract(self, text: str, listed: bool = False) -> Set[str]:
+        """
+        Canonical skills mentioned in a text, in a single linear pass.
+
+        Matches must sit on word boundaries, so "java" does not match inside
+        "javascript".
+
+        Args:
+            text: Free-text description
+            listed: Text is a listed skill name, so ambiguous aliases
+                (``listed_only``) may match too
+
+        Returns:
+            Set of canonical skill names
+        """
+        if not text:
+            return set()
+        lowered = text.lower()
+        size = len(lowered)
+        goto, fail, out = self._goto, self._fail, self._out
+        found = set()
+        state = 0
+
+        for end, char in enumerate(lowered):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for length, canonical, listed_only in out[state]:
+                if listed_only and not listed:
+                    continue
+                start = end - length + 1
+                if (start == 0 or not lowered[start - 1].isalnum()) and \
+                        (end + 1 == size or not lowered[end + 1].isalnum()):
+                    found.add(canonical)
+        return found
+
+    def normalize(self, skills: Iterable[str]) -> List[str]:
+        """Map listed skill names through the alias table, keeping unknown ones."""
+        result = []
+        for skill in skills:
+            matched = self.extract(skill, listed=True)
+            result.extend(sorted(matched) if matched else [skill.strip()])
+        return result
+
+    def pool(self, workers: Optional[int] = None) -> ProcessPoolExecutor:
+        """
+        Worker pool whose processes each build this extractor once.
+
+        Create it once and pass it to every ``extract_batch`` call, so
+        processes are not restarted per batch.
+
+        Args:
+            workers: Process count (default: CPU count)
+        """
+        return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                   initargs=(self.taxonomy, self.listed_only))
+
+    def extract_batch(self, texts: List[str], workers: Optional[int] = None,
+                      chunksize: int = 256,
+                      executor: Optional[Executor] = None) -> List[Set[str]]:
+        """
+        Extract skills from many descriptions across worker processes.
+
+        Each worker builds its own automaton once; descriptions are sent in
+        chunks to amortize inter-process overhead.
+
+        Args:
+            texts: Descriptions
+            workers: Process count (default: CPU count; 1 runs in-process)
+            chunksize: Descriptions per task
+            executor: Pool from ``pool()`` to reuse; without one a pool is
+                created for this call only
+
+        Returns:
+            Skill sets in the same order as texts
+        """
+        if workers == 1 or len(texts) < chunksize:
+            return [self.extract(text) for text in texts]
+
+        if executor is not None:
+            return list(executor.map(_extract_in_worker, texts, chunksize=chunksize))
+        with self.pool(workers) as executor:
+            return list(executor.map(_extract_in_worker, texts, chunksize=chunksize))
+
+
+_worker_extractor: Optional[SkillExtractor] = None
+
+
+def _init_worker(taxonomy: Dict[str, List[str]], listed_only: FrozenSet[str]):
+    global _worker_extractor
+    _worker_extractor = SkillExtractor(taxonomy, listed_only)
+
+
+def _extract_in_worker(text: str) -> Set[str]:
+    return _worker_extractor.extract(text)
+
+
+def job_text(job: Dict) -> str:
+    """Concatenate the free-text fields of a job that may mention skills."""
+    parts = [job.get('title'), job.get('description')]
+    requirements = job.get('requirements')
+    if isinstance(requirements, list):
+        parts.extend(requirements)
+    elif requirements:
+        parts.append(requirements)
+    return '\n'.join(str(part) for part in parts if part)
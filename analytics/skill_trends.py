@@ -6,41 +6,248 @@ Processes job listings to identify trending skills and create reports.
 
 import json
 import logging
-from typing import List, Dict, Any
+import os
+from typing import Iterable, Dict, Any, List, Optional
 from collections import Counter
 from pathlib import Path
 import csv
 
+from analytics.skill_extractor import job_text
+
 logger = logging.getLogger(__name__)
 
+OUTPUT_DIR = Path(__file__).parent.parent / "output"
+
 
 class SkillAnalyzer:
     """Analyzes skills trends from job data."""
 
-    def __init__(self, jobs: List[Dict[str, Any]]):
+    def __init__(self, jobs: Iterable[Dict[str, Any]], output_dir: Optional[Path] = None,
+                 extractor=None, workers: int = 1, batch_size: int = 10000, store=None):
         """
         Initialize the skill analyzer.
 
         Args:
-            jobs: List of job dictionaries with skills information
+            jobs: Job dictionaries with skills information; any iterable,
+                including a lazy reader, is consumed in a single pass
+            output_dir: Report and state directory (default: output/)
+            extractor: Optional SkillExtractor that normalizes listed skills
+                and finds skills in descriptions of jobs that list none
+            workers: Processes used for description extraction
+            batch_size: Jobs per extraction batch when workers > 1
+            store: Optional OutputStore; each report is then kept as a new
+                skill_trends run instead of overwriting skill_trends.csv
         """
         self.logger = logger
+        self.extractor = extractor
+        self.workers = workers
+        self.batch_size = batch_size
+        self.store = store
+        self.output_dir = Path(output_dir) if output_dir else OUTPUT_DIR
         self.jobs = jobs
         self.skill_counts = Counter()
+        self.job_count = 0
+
+    @classmethod
+    def from_jsonl(cls, path, output_dir: Optional[Path] = None, **kwargs) -> 'SkillAnalyzer':
+        """
+        Create an analyzer that streams jobs from exported record files.
+
+        Args:
+            path: jobs.jsonl(.gz) or framed jobs.frames(.gz) file, or a list
+                of files (e.g. the partitions of one OutputStore run)
+            output_dir: Report and state directory (default: output/)
+            **kwargs: Other SkillAnalyzer arguments
+
+        Returns:
+            SkillAnalyzer reading the file lazily during analysis
+        """
+        from experiments.record_codec import iter_records
+        paths = [path] if isinstance(path, (str, Path)) else list(path)
+        jobs = (job for p in paths for job in iter_records(p))
+        return cls(jobs, output_dir, **kwargs)
+
+    @classmethod
+    def from_history(cls, store, start_date: Optional[str] = None,
+                     end_date: Optional[str] = None, sources: Optional[List[str]] = None,
+                     output_dir: Optional[Path] = None, **kwargs) -> 'SkillAnalyzer':
+        """
+        Create an analyzer over the columnar job history.
+
+        Only the ``skills`` column of the matching partitions is read.
+
+        Args:
+            store: JobHistoryStore
+            start_date: Inclusive ISO start date
+            end_date: Inclusive ISO end date
+            sources: Restrict to these sources
+            output_dir: Report and state directory (default: output/)
+            **kwargs: Other SkillAnalyzer arguments
+
+        Returns:
+            SkillAnalyzer streaming skills batch by batch
+        """
+        def jobs():
+            for batch in store.iter_batches(['skills'], start_date, end_date, sources):
+                for skills in batch.column(0).to_pylist():
+                    yield {'skills': skills or []}
+        return cls(jobs(), output_dir, **kwargs)
+
+    @staticmethod
+    def listed_skills(job: Dict[str, Any]) -> List[str]:
+        """
+        Skills listed explicitly on a single job.
+
+        Args:
+            job: Job dictionary
+
+        Returns:
+            List of skill names (empty if the job lists none)
+        """
+        skills = job.get('skills')
+        if isinstance(skills, list):
+            return skills
+        if isinstance(skills, str):
+            return [skill.strip() for skill in skills.split(',')]
+        return []
+
+    def job_skills(self, job: Dict[str, Any]) -> List[str]:
+        """
+        Skills of a single job.
+
+        Listed skills are used when present (normalized through the
+        extractor's aliases if one is configured); otherwise the extractor
+        scans the job's description text.
+
+        Args:
+            job: Job dictionary
+
+        Returns:
+            List of skill names
+        """
+        listed = self.listed_skills(job)
+        if self.extractor is None:
+            return listed
+        if listed:
+            return self.extractor.normalize(listed)
+        return sorted(self.extractor.extract(job_text(job)))
 
     def extract_skills(self):
         """Extract and count skills from job listings."""
         self.logger.info("Extracting skills from job data")
 
-        for job in self.jobs:
-            if 'skills' in job:
-                skills = job['skills']
-                if isinstance(skills, list):
-                    self.skill_counts.update(skills)
-                elif isinstance(skills, str):
-                    self.skill_counts.update(skill.strip() for skill in skills.split(','))
+        job_count = 0
+        if self.extractor is not None and self.workers != 1:
+            # One pool for every batch of this run
+            with self.extractor.pool(self.workers) as executor:
+                batch = []
+                for job in self.jobs:
+                    job_count += 1
+                    batch.append(job)
+                    if len(batch) >= self.batch_size:
+                        self._count_batch(batch, executor)
+                        batch = []
+                if batch:
+                    self._count_batch(batch, executor)
+        else:
+            for job in self.jobs:
+                job_count += 1
+                self.skill_counts.update(self.job_skills(job))
+        self.job_count += job_count
 
-        self.logger.info(f"Extracted skills from {len(self.jobs)} jobs")
+        self.logger.info(f"Extracted skills from {job_count} jobs")
+
+    def _count_batch(self, jobs: List[Dict[str, Any]], executor=None):
+        """Count a batch, extracting unlisted skills across worker processes."""
+        unlisted = []
+        for job in jobs:
+            listed = self.listed_skills(job)
+            if listed:
+                self.skill_counts.update(self.extractor.normalize(listed))
+            else:
+                unlisted.append(job_text(job))
+        for skills in self.extractor.extract_batch(unlisted, self.workers, executor=executor):
+            self.skill_counts.update(skills)
+
+    def apply_changes(self, events: Iterable[Dict[str, Any]]):
+        """
+        Update counters from change events instead of the full job list.
+
+        Events come from FingerprintStore.classify / end_cycle: 'new' jobs
+        are added, 'removed' jobs subtracted, and 'changed' jobs replace
+        their previous version.
+
+        Args:
+            events: Iterable of change event dictionaries
+        """
+        applied = 0
+        for event in events:
+            change = event.get('change')
+            if change in ('removed', 'changed'):
+                old = event['job'] if change == 'removed' else event.get('previous', {})
+                self.skill_counts.subtract(self.job_skills(old))
+            if change in ('new', 'changed'):
+                self.skill_counts.update(self.job_skills(event['job']))
+            if change == 'new':
+                self.job_count += 1
+            elif change == 'removed':
+                self.job_count -= 1
+            applied += 1
+
+        # Drop skills no current job mentions any more
+        self.skill_counts = +self.skill_counts
+        self.logger.info(f"Applied {applied} job changes")
+
+    def default_state_path(self) -> Path:
+        """Location of the persisted counters."""
+        return self.output_dir / "skill_state.json"
+
+    def load_state(self, path: Optional[Path] = None):
+        """
+        Load persisted counters, starting empty if none exist yet.
+
+        Args:
+            path: State file (default: output/skill_state.json)
+        """
+        path = Path(path or self.default_state_path())
+        if not path.exists():
+            self.logger.info(f"No skill state at {path}, starting fresh")
+            return
+        with open(path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        self.skill_counts = Counter(state.get('skill_counts', {}))
+        self.job_count = state.get('job_count', 0)
+
+    def save_state(self, path: Optional[Path] = None):
+        """
+        Persist counters atomically.
+
+        Args:
+            path: State file (default: output/skill_state.json)
+        """
+        path = Path(path or self.default_state_path())
+        path.parent.mkdir(exist_ok=True)
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'job_count': self.job_count,
+                       'skill_counts': dict(self.skill_counts)}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def analyze_incremental(self, state_path: Optional[Path] = None):
+        """
+        Apply this run's change events to the persisted counters.
+
+        ``self.jobs`` must hold change events (e.g. output/changes.jsonl),
+        so the cost scales with the number of changes, not total history.
+
+        Args:
+            state_path: State file (default: output/skill_state.json)
+        """
+        self.logger.info("Starting incremental skill trend analysis")
+        self.load_state(state_path)
+        self.apply_changes(self.jobs)
+        self.save_state(state_path)
+        self.generate_report()
 
     def analyze(self):
         """Run complete skill analysis pipeline."""
@@ -50,10 +257,20 @@ class SkillAnalyzer:
 
     def generate_report(self):
         """Generate and export skill trend report."""
-        output_dir = Path(__file__).parent.parent / "output"
-        output_dir.mkdir(exist_ok=True)
+        if self.store is not None:
+            try:
+                with self.store.begin_run('skill_trends', fmt='csv') as run:
+                    writer = run.writer(fieldnames=['Skill', 'Frequency'])
+                    for skill, count in self.skill_counts.most_common():
+                        writer.write({'Skill': skill, 'Frequency': count})
+                self.logger.info(f"Skill trends report stored as run {run.run_id}")
+            except Exception as e:
+                self.logger.error(f"Error generating report: {str(e)}")
+            return
+
+        self.output_dir.mkdir(exist_ok=True)
 
-        output_file = output_dir / "skill_trends.csv"
+        output_file = self.output_dir / "skill_trends.csv"
 
         try:
             with open(output_file, 'w', newline='', encoding='utf-8') as f:
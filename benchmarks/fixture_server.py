@@ -0,0 +1,126 @@
+"""
+Local HTTP fixture server serving synthetic careers pages.
+
+Used by the benchmark suite so throughput can be measured offline with
+controlled latency, error rate and page size.
+"""
+
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlsplit
+
+SKILLS = ['Python', 'SQL', 'Go', 'Kubernetes', 'AWS', 'React', 'Java', 'Spark', 'Docker', 'Rust']
+LOCATIONS = ['Seattle, WA', 'Austin, TX', 'New York, NY', 'Remote', 'London, UK']
+TITLES = ['Data Engineer', 'Backend Engineer', 'ML Engineer', 'SRE', 'Frontend Engineer']
+
+
+def render_listing(page: int, jobs_per_page: int, seed: int = 0) -> str:
+    """
+    Render a synthetic listing page.
+
+    Args:
+        page: Page number (job ids are derived from it)
+        jobs_per_page: Number of div.job items
+        seed: Random seed so the same page is always identical
+
+    Returns:
+        HTML document
+    """
+    rng = random.Random(seed * 100003 + page)
+    items = []
+    for i in range(jobs_per_page):
+        job_id = page * jobs_per_page + i
+        skills = ', '.join(rng.sample(SKILLS, 3))
+        items.append(
+            f'<div class="job" data-id="{job_id}">'
+            f'<h2>{rng.choice(TITLES)}</h2>'
+            f'<span class="location">{rng.choice(LOCATIONS)}</span>'
+            f'<span class="skills">{skills}</span>'
+            f'<p class="description">{"Build reliable data systems. " * 5}</p>'
+            f'<a href="/jobs/{job_id}">Apply</a></div>'
+        )
+    return f"<html><body><main>{''.join(items)}</main></body></html>"
+
+
+class FixtureServer:
+    """Threaded local server with configurable latency, errors and page size."""
+
+    def __init__(self, latency: float = 0.0, error_rate: float = 0.0,
+                 jobs_per_page: int = 50, seed: int = 0, port: int = 0):
+        """
+        Initialize fixture server.
+
+        Args:
+            latency: Seconds to sleep before every response
+            error_rate: Fraction of requests answered with 503
+            jobs_per_page: Jobs per listing page
+            seed: Seed for page content and error injection
+            port: Port to bind (0 picks a free one)
+        """
+        self.latency = latency
+        self.error_rate = error_rate
+        self.jobs_per_page = jobs_per_page
+        self.seed = seed
+        self.requests_served = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def listing_url(self, page: int) -> str:
+        return f"{self.base_url}/jobs?page={page}"
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _should_fail(self) -> bool:
+        with self._lock:
+            self.requests_served += 1
+            return self._rng.random() < self.error_rate
+
+    def _handler(self):
+        fixture = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if fixture.latency:
+                    time.sleep(fixture.latency)
+                if fixture._should_fail():
+                    self.send_error(503)
+                    return
+
+                query = parse_qs(urlsplit(self.path).query)
+                page = int(query.get('page', ['0'])[0])
+                body = render_listing(page, fixture.jobs_per_page, fixture.seed).encode('utf-8')
+
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
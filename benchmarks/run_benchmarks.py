@@ -0,0 +1,309 @@
+"""
+Offline benchmark suite for the scraping pipeline.
+
+Runs every stage against a local fixture server and reports throughput,
+latency percentiles and resident memory growth as JSON, so results from two
+runs can be compared for regressions:
+
+    python benchmarks/run_benchmarks.py --output bench.json
+    python benchmarks/run_benchmarks.py --compare bench.json
+"""
+
+import argparse
+import importlib.util
+import json
+import resource
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import psutil
+except ImportError:  # Per-stage memory is not reported without psutil
+    psutil = None
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(ROOT), str(ROOT / "experiments")]
+
+# logging/logger.py is shadowed by the standard library package of the same
+# name, so register it explicitly before importing the scheduler
+_spec = importlib.util.spec_from_file_location("logging.logger", ROOT / "logging" / "logger.py")
+_logger_module = importlib.util.module_from_spec(_spec)
+sys.modules["logging.logger"] = _logger_module
+_spec.loader.exec_module(_logger_module)
+
+from fixture_server import FixtureServer  # noqa: E402
+from http_request_with_retry import RetryableHTTPClient  # noqa: E402
+from dom_parsing_example import ExtractionPlan, extract_text  # noqa: E402
+from utils import extract_data  # noqa: E402
+from aggregate_scraper import AggregatedScraper  # noqa: E402
+from record_codec import benchmark_codecs, iter_records  # noqa: E402
+from job_record import memory_per_record  # noqa: E402
+from near_duplicates import dedupe  # noqa: E402
+from analytics.skill_trends import SkillAnalyzer  # noqa: E402
+from scheduler import JobMarketScheduler  # noqa: E402
+
+JOB_PLAN = ExtractionPlan('div.job', {
+    'job_id': ('', 'data-id'),
+    'title': 'h2',
+    'location': '.location',
+    'skills': '.skills',
+    'description': '.description',
+    'url': ('a', 'href'),
+})
+
+
+class FixtureScraper:
+    """Source scraper that reads listing pages from the fixture server."""
+
+    def __init__(self, server: FixtureServer, pages: int, client: RetryableHTTPClient):
+        self.server = server
+        self.pages = pages
+        self.client = client
+        self.fingerprints = None
+
+    def scrape(self):
+        for page in range(self.pages):
+            response = self.client.get(self.server.listing_url(page))
+            if response is None:
+                continue
+            for record in JOB_PLAN.extract(response.text):
+                record['company'] = 'Fixture Corp'
+                yield record
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile, or None for an empty list."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def rss_growth(func: Callable[[], Any]) -> Optional[float]:
+    """
+    Peak resident memory a call adds above the RSS it started from.
+
+    RSS is sampled every few milliseconds, so it covers C allocations
+    (lxml, sqlite, compressors) that tracemalloc cannot see.
+
+    Returns:
+        Megabytes, or None when psutil is not installed
+    """
+    if psutil is None:
+        func()
+        return None
+    process = psutil.Process()
+    baseline = process.memory_info().rss
+    peak = baseline
+    done = threading.Event()
+
+    def sample():
+        nonlocal peak
+        while not done.is_set():
+            peak = max(peak, process.memory_info().rss)
+            time.sleep(0.005)
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    try:
+        func()
+    finally:
+        done.set()
+        sampler.join()
+    return (max(peak, process.memory_info().rss) - baseline) / (1024 * 1024)
+
+
+def measure(func: Callable[[], Any], items: int,
+            latencies: Optional[List[float]] = None) -> Dict[str, Any]:
+    """
+    Measure a stage's memory growth, then time it in a separate run.
+
+    The timed run has no tracing or sampling active, so throughput and
+    latencies are not skewed by the memory measurement. Stages must
+    therefore be repeatable: each one resets the lists it fills.
+
+    Args:
+        func: Stage to run
+        items: Number of units (pages, records) the stage processes
+        latencies: Optional list the stage fills with per-item timings
+
+    Returns:
+        Stage result dictionary
+    """
+    growth = rss_growth(func)
+
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+
+    result = {
+        'seconds': elapsed,
+        'items': items,
+        'items_per_sec': items / elapsed if elapsed else None,
+        'rss_growth_mb': growth,
+    }
+    if latencies:
+        result['p50_ms'] = percentile(latencies, 50) * 1000
+        result['p95_ms'] = percentile(latencies, 95) * 1000
+        result['mean_ms'] = statistics.mean(latencies) * 1000
+    return result
+
+
+def run(pages: int, jobs_per_page: int, latency: float, error_rate: float) -> Dict[str, Any]:
+    """Run every benchmark stage and return the results."""
+    results: Dict[str, Any] = {
+        'config': {'pages': pages, 'jobs_per_page': jobs_per_page,
+                   'latency': latency, 'error_rate': error_rate},
+        'stages': {},
+    }
+    stages = results['stages']
+
+    with FixtureServer(latency=latency, error_rate=error_rate,
+                       jobs_per_page=jobs_per_page) as server, \
+            tempfile.TemporaryDirectory() as tmp:
+        client = RetryableHTTPClient(max_retries=3, backoff_factor=0.01)
+
+        pages_html: List[str] = []
+        fetch_latencies: List[float] = []
+
+        def fetch():
+            pages_html.clear()
+            fetch_latencies.clear()
+            for page in range(pages):
+                start = time.perf_counter()
+                response = client.get(server.listing_url(page))
+                fetch_latencies.append(time.perf_counter() - start)
+                if response is not None:
+                    pages_html.append(response.text)
+
+        stages['fetch'] = measure(fetch, pages, fetch_latencies)
+
+        parse_latencies: List[float] = []
+        jobs: List[Dict[str, Any]] = []
+
+        def parse_plan():
+            jobs.clear()
+            parse_latencies.clear()
+            for html in pages_html:
+                start = time.perf_counter()
+                jobs.extend(JOB_PLAN.extract(html))
+                parse_latencies.append(time.perf_counter() - start)
+
+        stages['parse_plan'] = measure(parse_plan, len(pages_html), parse_latencies)
+
+        legacy_latencies: List[float] = []
+
+        def parse_per_field():
+            legacy_latencies.clear()
+            for html in pages_html:
+                start = time.perf_counter()
+                extract_text(html, 'div.job h2')
+                extract_text(html, 'div.job .location')
+                extract_data(html, 'div.job a', 'href')
+                legacy_latencies.append(time.perf_counter() - start)
+
+        stages['parse_per_field'] = measure(parse_per_field, len(pages_html), legacy_latencies)
+
+        export_dir = Path(tmp) / "export"
+        stages['export'] = measure(
+            lambda: AggregatedScraper(scrapers=[], output_dir=export_dir).export_jobs(jobs),
+            len(jobs)
+        )
+
+        # Previous export format, kept as the serialization baseline
+        def export_json_indent2():
+            with open(export_dir / "jobs.json", 'w', encoding='utf-8') as f:
+                json.dump(jobs, f, indent=2)
+
+        stages['export_json_indent2'] = measure(export_json_indent2, len(jobs))
+        framed_exporter = AggregatedScraper(scrapers=[], output_dir=export_dir, record_format='frames')
+        stages['export_frames'] = measure(lambda: framed_exporter.export_jobs(jobs), len(jobs))
+
+        # Reading the export back, as analytics in another process does
+        stages['handoff_json_indent2'] = measure(
+            lambda: json.loads((export_dir / "jobs.json").read_text(encoding='utf-8')), len(jobs)
+        )
+        stages['handoff_jsonl'] = measure(
+            lambda: sum(1 for _ in iter_records(export_dir / "jobs.jsonl")), len(jobs)
+        )
+        stages['handoff_frames'] = measure(
+            lambda: sum(1 for _ in iter_records(framed_exporter.output_file)), len(jobs)
+        )
+        results['codecs'] = benchmark_codecs(jobs)
+        results['record_memory'] = memory_per_record(jobs)
+        stages['dedup'] = measure(lambda: dedupe(jobs), len(jobs))
+
+        analyze_dir = Path(tmp) / "analyze"
+        analyze_dir.mkdir()
+        stages['analyze'] = measure(
+            lambda: SkillAnalyzer(jobs, analyze_dir).analyze(), len(jobs)
+        )
+
+        pipeline_dir = Path(tmp) / "pipeline"
+        pipeline_dir.mkdir()
+        scheduler = JobMarketScheduler(
+            scrapers=[FixtureScraper(server, pages, client)], output_dir=pipeline_dir
+        )
+        stages['pipeline'] = measure(scheduler.execute, pages)
+        results['requests_served'] = server.requests_served
+
+    # ru_maxrss is in kilobytes on Linux: the high-water mark of the whole run
+    results['process_max_rss_mb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return results
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> bool:
+    """
+    Print per-stage throughput changes against a baseline run.
+
+    Returns:
+        True if any stage slowed down by more than ``threshold``
+    """
+    regressed = False
+    for stage, result in current['stages'].items():
+        base = baseline.get('stages', {}).get(stage)
+        if not base or not base.get('items_per_sec') or not result.get('items_per_sec'):
+            continue
+        ratio = result['items_per_sec'] / base['items_per_sec']
+        flag = ''
+        if ratio < 1 - threshold:
+            flag = '  REGRESSION'
+            regressed = True
+        print(f"{stage:16s} {base['items_per_sec']:10.1f} -> "
+              f"{result['items_per_sec']:10.1f} items/s ({ratio:5.2f}x){flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pages', type=int, default=50)
+    parser.add_argument('--jobs-per-page', type=int, default=50)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds per response')
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--output', help='write results JSON to this file')
+    parser.add_argument('--compare', help='baseline results JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='allowed throughput drop before flagging a regression')
+    args = parser.parse_args()
+
+    results = run(args.pages, args.jobs_per_page, args.latency, args.error_rate)
+    text = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).write_text(text, encoding='utf-8')
+    else:
+        print(text)
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding='utf-8'))
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+"""
+Adaptive static-vs-rendered fetching.
+
+Tries a plain HTTP fetch (over the pooled AsyncHTTPClient) first and only
+falls back to a Chromium render when the extraction selectors find nothing
+in the static HTML. The outcome
+is remembered per domain and URL pattern, so most pages never touch a
+browser, and pages that needed rendering are re-probed statically now and
+then in case the site changed.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
+from urllib.parse import urlsplit
+
+from async_http_client import AsyncHTTPClient
+from dom_parsing_example import ExtractionPlan, compile_selector, parse_html
+
+logger = logging.getLogger(__name__)
+
+STATIC = 'static'
+RENDER = 'render'
+
+# Path segments that identify one item rather than a page type
+_ID_SEGMENT = re.compile(r'^(?=.*\d)[\w-]+$|^[0-9a-f]{16,}$', re.IGNORECASE)
+
+
+class PageUnavailable(Exception):
+    """The static fetch got a client error (404, 410, ...); rendering would not help."""
+
+
+def url_pattern(url: str) -> str:
+    """
+    Reduce a URL to its domain plus path shape.
+
+    The first segment that looks like an id ends the pattern, so
+    '/en/jobs/12345/software-engineer' and '/en/jobs/67890/data-scientist'
+    both map to 'host/en/jobs/*'.
+
+    Args:
+        url: Page URL
+
+    Returns:
+        Pattern string such as 'www.amazon.jobs/en/jobs/*'
+    """
+    parts = urlsplit(url)
+    segments = []
+    for segment in filter(None, parts.path.split('/')):
+        if _ID_SEGMENT.match(segment):
+            segments.append('*')
+            break
+        segments.append(segment.lower())
+    return '/'.join([(parts.hostname or '').lower()] + segments)
+
+
+class AdaptiveFetcher:
+    """Static-first fetcher that remembers which pages need a browser."""
+
+    def __init__(self, selectors: Union[ExtractionPlan, str, Sequence[str]],
+                 min_matches: int = 1, reprobe_interval: float = 24 * 3600,
+                 reprobe_every: int = 200, state_path: Optional[str] = None,
+                 pool=None, wait_selector: Optional[str] = None,
+                 client: Optional[AsyncHTTPClient] = None):
+        """
+        Initialize adaptive fetcher.
+
+        Args:
+            selectors: Extraction plan or CSS selector(s) that must match for
+                the static HTML to be usable
+            min_matches: Elements each selector has to find
+            reprobe_interval: Seconds after which a render decision is
+                re-checked with a static fetch
+            reprobe_every: Also re-probe after this many rendered fetches
+            state_path: Optional JSON file to persist decisions across runs
+            pool: Optional BrowserPool for rendered fetches
+            wait_selector: Selector to wait for when rendering (default: the
+                first extraction selector)
+            client: Shared async HTTP client for static fetches (created on
+                demand if omitted, and closed by ``close``)
+        """
+        if isinstance(selectors, ExtractionPlan):
+            self.plan = selectors
+            selectors = [selectors.item_selector] if selectors.item_selector else []
+        else:
+            self.plan = None
+            selectors = [selectors] if isinstance(selectors, str) else list(selectors)
+        if not selectors:
+            raise ValueError("AdaptiveFetcher needs at least one selector to probe with")
+
+        self.selectors = selectors
+        self.min_matches = min_matches
+        self.reprobe_interval = reprobe_interval
+        self.reprobe_every = reprobe_every
+        self.state_path = Path(state_path) if state_path else None
+        self.pool = pool
+        self.wait_selector = wait_selector or selectors[0]
+        self._owns_client = client is None
+        self.client = client or AsyncHTTPClient()
+        self.logger = logger
+
+        self._lock = threading.Lock()
+        self.decisions: Dict[str, Dict] = self._load_state()
+        self.stats = {'static': 0, 'render': 0, 'fallbacks': 0, 'reprobes': 0}
+
+    async def close(self):
+        """Close the HTTP client if this fetcher created it."""
+        if self._owns_client:
+            await self.client.close()
+
+    def _load_state(self) -> Dict[str, Dict]:
+        if not self.state_path or not self.state_path.exists():
+            return {}
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.error(f"Error loading fetch decisions: {str(e)}")
+            return {}
+
+    def save_state(self):
+        """Atomically persist the per-domain/pattern decisions."""
+        if not self.state_path:
+            return
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            data = json.dumps(self.decisions, indent=2)
+        fd, tmp_path = tempfile.mkstemp(dir=self.state_path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(tmp_path, self.state_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def is_usable(self, html: str) -> bool:
+        """Whether every selector finds enough elements in the HTML."""
+        return self._usable_soup(html) is not None
+
+    def _usable_soup(self, html: str):
+        """The parsed document if every selector matches enough, else None."""
+        soup = parse_html(html, self.plan.parser if self.plan is not None else None)
+        if all(len(compile_selector(selector).select(soup)) >= self.min_matches
+               for selector in self.selectors):
+            return soup
+        return None
+
+    def decision(self, url: str) -> Optional[Dict]:
+        """Remembered decision for a URL: its pattern first, then its domain."""
+        pattern = url_pattern(url)
+        domain = pattern.split('/', 1)[0]
+        with self._lock:
+            return self.decisions.get(pattern) or self.decisions.get(domain)
+
+    def _should_probe_static(self, decision: Optional[Dict]) -> bool:
+        if decision is None or decision['mode'] == STATIC:
+            return True
+        if time.time() - decision['decided_at'] >= self.reprobe_interval:
+            return True
+        return decision.get('renders', 0) >= self.reprobe_every
+
+    def _remember(self, url: str, mode: str):
+        pattern = url_pattern(url)
+        domain = pattern.split('/', 1)[0]
+        now = time.time()
+        with self._lock:
+            for key in (pattern, domain):
+                previous = self.decisions.get(key)
+                if previous and previous['mode'] != mode:
+                    self.logger.info(f"Fetch mode for {key} changed: {previous['mode']} -> {mode}")
+                self.decisions[key] = {'mode': mode, 'decided_at': now, 'renders': 0}
+
+    def _count_render(self, url: str):
+        pattern = url_pattern(url)
+        with self._lock:
+            decision = self.decisions.get(pattern) or self.decisions.get(pattern.split('/', 1)[0])
+            if decision:
+                decision['renders'] = decision.get('renders', 0) + 1
+
+    async def _render(self, url: str) -> str:
+        # Imported lazily so static-only crawls do not need Playwright
+        from js_rendering_example import render_page
+        return await render_page(url, wait_selector=self.wait_selector, pool=self.pool)
+
+    async def fetch(self, url: str) -> Dict:
+        """
+        Fetch a page statically if possible, rendering it otherwise.
+
+        Only a successful static fetch whose HTML lacks the selectors
+        decides the mode for the URL pattern and domain; a failed fetch
+        (timeout, connection error, 5xx after retries) renders this page
+        without remembering anything. A client error such as 404 or 410 is
+        not rendered at all.
+
+        Args:
+            url: URL to fetch
+
+        Returns:
+            Dictionary with url, html, mode ('static' or 'render') and, when
+            an ExtractionPlan was given, the extracted items
+
+        Raises:
+            PageUnavailable: If the server answered with a 4xx status
+        """
+        decision = self.decision(url)
+        html = None
+        soup = None
+        mode = RENDER
+
+        if self._should_probe_static(decision):
+            if decision is not None and decision['mode'] == RENDER:
+                self.stats['reprobes'] += 1
+            # None means the request failed (network error or 5xx after
+            # retries); that says nothing about whether the page needs JS
+            response = await self.client.get(url, client_errors=True)
+            if response is not None and response['status'] >= 400:
+                raise PageUnavailable(f"{url} returned HTTP {response['status']}")
+            if response is not None:
+                html = response['text']
+            if html is not None:
+                soup = self._usable_soup(html)
+                if soup is not None:
+                    mode = STATIC
+                else:
+                    html = None
+                if decision is None or decision['mode'] != mode or mode == RENDER:
+                    self._remember(url, mode)
+            if html is None:
+                self.stats['fallbacks'] += 1
+
+        if html is None:
+            html = await self._render(url)
+            self._count_render(url)
+
+        self.stats[mode] += 1
+        result = {'url': url, 'html': html, 'mode': mode}
+        if self.plan is not None:
+            # Reuse the tree parsed for the usability check
+            result['items'] = self.plan.extract(soup if soup is not None else html)
+        return result
+
+    async def fetch_many(self, urls: List[str], concurrency: int = 8) -> List[Optional[Dict]]:
+        """
+        Fetch many pages with bounded concurrency.
+
+        Args:
+            urls: URLs to fetch
+            concurrency: Pages in flight at once
+
+        Returns:
+            Results in the same order as urls (None for failures)
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def bounded(url):
+            async with semaphore:
+                return await self.fetch(url)
+
+        results = await asyncio.gather(*(bounded(url) for url in urls), return_exceptions=True)
+        for url, result in zip(urls, results):
+            if isinstance(result, Exception):
+                self.logger.error(f"Error fetching {url}: {str(result)}")
+        return [None if isinstance(r, Exception) else r for r in results]
+
+
+if __name__ == "__main__":
+    # Example usage
+    plan = ExtractionPlan('div.job', {'title': 'h2', 'location': '.location'})
+    fetcher = AdaptiveFetcher(plan, state_path='output/fetch_decisions.json')
+
+    # async def main():
+    #     try:
+    #         return await fetcher.fetch_many(["https://example.com/jobs?page=1"])
+    #     finally:
+    #         await fetcher.close()
+    # results = asyncio.run(main())
+    # fetcher.save_state()
+    # print(fetcher.stats, fetcher.decisions)
+    print(url_pattern("https://www.amazon.jobs/en/jobs/2345678/software-engineer"))
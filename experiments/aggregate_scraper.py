@@ -4,64 +4,437 @@ Aggregated scraper for multiple job sources.
 Combines results from all individual scrapers and manages data export.
 """
 
-import json
 import logging
-from typing import List, Dict, Any
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Iterable, List, Dict, Any, Optional
 from pathlib import Path
 
 from google_careers import GoogleCareersScraper
 from microsoft_careers import MicrosoftCareersScraper
 from amazon_jobs import AmazonJobsScraper
+from fingerprint_store import FingerprintStore
+from job_record import JobRecord
+from jsonl_writer import JSONLinesWriter
+from near_duplicates import NearDuplicateIndex
+from output_store import OutputStore
+from record_codec import FramedWriter
+from metrics import REGISTRY, SOURCE_JOBS, SOURCE_RUNS, STAGE_LATENCY, time_stage
 
 logger = logging.getLogger(__name__)
 
 
+class _SourceAbandoned(Exception):
+    """Raised inside a source that kept running past its deadline."""
+
+
 class AggregatedScraper:
     """Coordinates scraping from multiple sources."""
 
-    def __init__(self):
-        """Initialize the aggregated scraper."""
+    def __init__(self, concurrent: bool = True, max_workers: Optional[int] = None,
+                 source_timeout: Optional[float] = 300.0, compress: Optional[str] = None,
+                 fingerprints: Optional[FingerprintStore] = None,
+                 scrapers: Optional[List[Any]] = None, output_dir: Optional[Path] = None,
+                 store: Optional[OutputStore] = None, record_format: str = 'jsonl',
+                 dedup: Optional[NearDuplicateIndex] = None):
+        """
+        Initialize the aggregated scraper.
+
+        Args:
+            concurrent: Run sources in parallel on a thread pool
+            max_workers: Worker threads (default: one per source)
+            source_timeout: Seconds a single source may run before it is
+                abandoned (None disables the deadline)
+            compress: None or 'gzip' for the export file
+            fingerprints: Optional store enabling incremental mode, in which
+                only new, changed and removed jobs are exported
+            scrapers: Source scrapers (default: Google, Microsoft and Amazon)
+            output_dir: Export directory (default: output/)
+            store: Optional OutputStore; each run is then written to its own
+                source/date partitions instead of overwriting output_file
+            record_format: 'jsonl', or 'frames' for length-prefixed binary
+                records (msgpack when installed) that analytics in another
+                process decodes faster
+            dedup: Optional NearDuplicateIndex; near-duplicate postings
+                across and within sources are then merged into one
+                canonical record before export (not available in
+                incremental mode)
+        """
+        if dedup is not None and fingerprints is not None:
+            raise ValueError("dedup cannot be combined with incremental fingerprints")
         self.logger = logger
-        self.scrapers = [
+        self.scrapers = scrapers if scrapers is not None else [
             GoogleCareersScraper(),
             MicrosoftCareersScraper(),
             AmazonJobsScraper(),
         ]
+        self.output_dir = Path(output_dir) if output_dir else Path(__file__).parent.parent / "output"
+        self.concurrent = concurrent
+        self.max_workers = max_workers
+        self.source_timeout = source_timeout
+        self.compress = compress
+        self.fingerprints = fingerprints
+        self.store = store
+        self.record_format = record_format
+        self.dedup = dedup
+        for scraper in self.scrapers:
+            # Lets scrapers skip detail fetches for unchanged postings
+            scraper.fingerprints = fingerprints
+        self.source_stats: List[Dict[str, Any]] = []
+        self.export_path: Optional[Path] = None
+        self.export_paths: List[Path] = []
+        # Whether the last export was published (it may still hold no files)
+        self.published = False
+        self.metrics = REGISTRY
+
+    @property
+    def dataset(self) -> str:
+        """Export name: change events in incremental mode, otherwise jobs."""
+        return 'changes' if self.fingerprints is not None else 'jobs'
 
-    def scrape_all(self) -> List[Dict[str, Any]]:
+    @property
+    def output_file(self) -> Path:
+        """Path of the export file when no OutputStore is used."""
+        suffix = f".{self.record_format}" + ('.gz' if self.compress == 'gzip' else '')
+        return self.output_dir / f"{self.dataset}{suffix}"
+
+    def _open_sink(self):
+        """Writer for one export: a store run, or the single overwritten file."""
+        if self.store is not None:
+            return self.store.begin_run(self.dataset, fmt=self.record_format)
+        writer_class = FramedWriter if self.record_format == 'frames' else JSONLinesWriter
+        writer = writer_class(self.output_file, self.compress)
+        writer.open()
+        return writer
+
+    def _publish(self, sink):
+        """Make a finished export visible and remember where it went."""
+        self.published = True
+        if self.store is not None:
+            sink.commit()
+            self.export_path = None
+            self.export_paths = sink.paths
+        else:
+            sink.close()
+            self.export_path = sink.path
+            self.export_paths = [sink.path]
+
+    def scrape_all(self, collect: bool = True, sources: Optional[List[str]] = None,
+                   compact: bool = False) -> List[Dict[str, Any]]:
         """
         Run all scrapers and aggregate results.
 
+        Jobs are streamed to the JSON Lines export as each scraper yields
+        them. In incremental mode the export holds change events instead
+        (see FingerprintStore.classify), and only new, changed and removed
+        jobs are emitted. Per-source timing and outcome are recorded in
+        ``self.source_stats``.
+
+        With ``dedup`` set, jobs are instead held in the index as compact
+        records while the sources run, and only canonical records (with
+        ``duplicate_sources``) are exported once every source has finished.
+
+        Args:
+            collect: Also keep every exported record in memory and return it;
+                pass False to keep memory flat and read ``self.export_paths``
+            sources: Optional scraper class names to run (default: all)
+            compact: Keep collected jobs as JobRecords (slotted, interned,
+                dict-compatible) instead of dicts, for large in-memory runs
+
         Returns:
-            Combined list of all jobs from all sources
+            Combined list of exported records (empty if not collected)
         """
         all_jobs = []
+        sink = None
+        # Nothing from an earlier run may look like this run's output
+        self.export_path = None
+        self.export_paths = []
+        self.source_stats = []
+        self.published = False
+
+        try:
+            sink = self._open_sink()
+            store = self.store is not None
+            # Writes are interleaved with scraping, so their time is summed and
+            # observed once per export, like export_jobs does
+            spent = {'export': 0.0, 'dedup': 0.0}
+
+            def export(job, source):
+                start = time.perf_counter()
+                if store:
+                    sink.write(job, source)
+                else:
+                    sink.write(job)
+                spent['export'] += time.perf_counter() - start
+                if collect:
+                    all_jobs.append(JobRecord.from_dict(job) if compact and 'change' not in job
+                                    else job)
+
+            def deduplicate(job, source):
+                start = time.perf_counter()
+                self.dedup.add(job, source)
+                spent['dedup'] += time.perf_counter() - start
+
+            emit = export
+            if self.dedup is not None:
+                self.dedup.reset()
+                emit = deduplicate
+
+            scrapers = [s for s in self.scrapers
+                        if sources is None or s.__class__.__name__ in sources]
+            if self.concurrent and len(scrapers) > 1:
+                results = self._scrape_concurrent(emit, scrapers)
+            else:
+                results = [self._run_source(scraper, emit) for scraper in scrapers]
+            if self.dedup is not None:
+                for record, source in self.dedup.records():
+                    export(record.to_dict(), source)
+                stats = self.dedup.stats()
+                self.logger.info(f"Merged {stats['duplicates']} near-duplicate postings "
+                                 f"into {stats['unique']} jobs")
+            if store:
+                # A source that finished with no rows must not keep its old file in LATEST
+                for stats in results:
+                    if stats['status'] == 'ok':
+                        sink.cover(stats['source'])
+            start = time.perf_counter()
+            self._publish(sink)
+            spent['export'] += time.perf_counter() - start
+            STAGE_LATENCY.observe(spent['export'], 'export')
+            if self.dedup is not None:
+                STAGE_LATENCY.observe(spent['dedup'], 'dedup')
+            if self.fingerprints is not None:
+                # Only now are this cycle's postings recorded as seen, and only
+                # for sources whose events all made it into the export
+                self.fingerprints.commit([stats['source'] for stats in results
+                                          if stats['status'] == 'ok'])
+        except Exception as e:
+            self.logger.error(f"Error exporting jobs: {str(e)}")
+            if sink is not None:
+                sink.abort()
+            if self.fingerprints is not None:
+                self.fingerprints.rollback()
+            return all_jobs
+
+        self.source_stats = results
+        for stats in results:
+            if stats['status'] == 'ok':
+                self.logger.info(f"Added {stats['jobs']} jobs from {stats['source']} "
+                                 f"in {stats['elapsed']:.2f}s")
+        self.logger.info(f"Exported {sink.count} jobs to "
+                         f"{', '.join(str(p) for p in self.export_paths) or 'no files'}")
 
-        for scraper in self.scrapers:
-            try:
-                jobs = scraper.scrape()
-                all_jobs.extend(jobs)
-                self.logger.info(f"Added {len(jobs)} jobs from {scraper.__class__.__name__}")
-            except Exception as e:
-                self.logger.error(f"Error with {scraper.__class__.__name__}: {str(e)}")
-
-        self.export_jobs(all_jobs)
         return all_jobs
 
-    def export_jobs(self, jobs: List[Dict[str, Any]]):
+    def _run_source(self, scraper, emit: Callable[[Dict[str, Any], str], None],
+                    counts: Optional[List[int]] = None, index: int = 0,
+                    abandoned: Optional[Callable[[], bool]] = None) -> Dict[str, Any]:
         """
-        Export jobs to JSON file.
+        Run one scraper, passing each job to ``emit`` as it is produced.
 
         Args:
-            jobs: List of job dictionaries to export
+            scraper: Source scraper; ``scrape()`` may return a list or a generator
+            emit: Callback receiving each job and the source name
+            counts: Optional shared list updated with the running job count
+            index: Position of this source in ``counts``
+            abandoned: Optional check that stops the source once its
+                deadline has passed
+
+        Returns:
+            Stats dictionary with timing and outcome
         """
-        output_dir = Path(__file__).parent.parent / "output"
-        output_dir.mkdir(exist_ok=True)
+        name = scraper.__class__.__name__
+        start = time.monotonic()
+        count = 0
+        changes = Counter()
+        if self.fingerprints is not None:
+            self.fingerprints.begin_cycle(name)
+        try:
+            for job in scraper.scrape():
+                if abandoned is not None and abandoned():
+                    raise _SourceAbandoned()
+                count += 1
+                if counts is not None:
+                    counts[index] = count
+                if self.fingerprints is None:
+                    emit(job, name)
+                    continue
+                event = self.fingerprints.classify(name, job)
+                changes[event['change']] += 1
+                if event['change'] != 'unchanged':
+                    emit(event, name)
+            if abandoned is not None and abandoned():
+                raise _SourceAbandoned()
+            if self.fingerprints is not None:
+                for event in self.fingerprints.end_cycle(name):
+                    changes['removed'] += 1
+                    emit(event, name)
+            status, error = 'ok', None
+        except _SourceAbandoned:
+            self.logger.debug(f"Stopped abandoned source {name}")
+            status, error = 'timeout', 'abandoned after deadline'
+        except Exception as e:
+            self.logger.error(f"Error with {name}: {str(e)}")
+            status, error = 'error', str(e)
+
+        if self.fingerprints is not None and status != 'ok':
+            self.fingerprints.abandon_cycle(name)
+
+        SOURCE_JOBS.inc(name, amount=count)
+        SOURCE_RUNS.inc(name, status)
+        stats = {
+            'source': name,
+            'status': status,
+            'jobs': count,
+            'elapsed': time.monotonic() - start,
+            'error': error,
+        }
+        if self.fingerprints is not None:
+            stats.update({k: changes[k] for k in ('new', 'changed', 'unchanged', 'removed')})
+        return stats
 
-        output_file = output_dir / "jobs.json"
+    def _scrape_concurrent(self, emit: Callable[[Dict[str, Any], str], None],
+                           scrapers: List[Any]) -> List[Dict[str, Any]]:
+        """
+        Run all scrapers on a thread pool with a per-source deadline.
+
+        A source that exceeds ``source_timeout`` is abandoned: jobs it
+        emitted before the deadline are kept, anything after is dropped.
+        Sources still queued are cancelled once every worker is held by an
+        abandoned source, since they could never start.
+
+        Threads cannot be interrupted, so an abandoned source keeps running
+        until it next yields a job (or returns); only then does it stop.
+        The deadline check and the write happen under one lock, so nothing
+        from an abandoned source reaches the export after this returns.
+
+        Returns:
+            List of stats dictionaries in scraper order
+        """
+        workers = self.max_workers or len(scrapers)
+        executor = ThreadPoolExecutor(max_workers=workers,
+                                      thread_name_prefix='source')
+        started: Dict[int, float] = {}
+        counts = [0] * len(scrapers)
+        closed = set()
+        gate = threading.Lock()
+
+        def task(index, scraper):
+            started[index] = time.monotonic()
+
+            def guarded_emit(job, source):
+                with gate:
+                    if index in closed:
+                        raise _SourceAbandoned()
+                    emit(job, source)
+
+            return self._run_source(scraper, guarded_emit, counts, index,
+                                    abandoned=lambda: index in closed)
+
+        futures = {executor.submit(task, i, scraper): i
+                   for i, scraper in enumerate(scrapers)}
+        results: List[Optional[Dict[str, Any]]] = [None] * len(scrapers)
+        pending = set(futures)
+        abandoned = set()
+
+        try:
+            while pending:
+                wait_for = None
+                if self.source_timeout is not None:
+                    now = time.monotonic()
+                    deadlines = [started[futures[f]] + self.source_timeout
+                                 for f in pending if futures[f] in started]
+                    wait_for = max(0.0, min(deadlines) - now) if deadlines else 0.05
+
+                done, pending = wait(pending, timeout=wait_for,
+                                     return_when=FIRST_COMPLETED)
+                for future in done:
+                    results[futures[future]] = future.result()
+
+                if self.source_timeout is None:
+                    continue
+
+                now = time.monotonic()
+                for future in list(pending):
+                    index = futures[future]
+                    if index in started and now - started[index] >= self.source_timeout:
+                        with gate:
+                            closed.add(index)
+                        future.cancel()
+                        pending.discard(future)
+                        abandoned.add(future)
+                        name = scrapers[index].__class__.__name__
+                        self.logger.error(f"{name} timed out after {self.source_timeout}s, "
+                                          f"keeping {counts[index]} partial jobs")
+                        results[index] = {
+                            'source': name,
+                            'status': 'timeout',
+                            'jobs': counts[index],
+                            'elapsed': now - started[index],
+                            'error': f"timed out after {self.source_timeout}s",
+                        }
+
+                abandoned = {f for f in abandoned if not f.done()}
+                if len(abandoned) >= workers:
+                    for future in list(pending):
+                        index = futures[future]
+                        if index not in started and future.cancel():
+                            pending.discard(future)
+                            name = scrapers[index].__class__.__name__
+                            self.logger.error(f"{name} cancelled: no free workers")
+                            results[index] = {
+                                'source': name,
+                                'status': 'cancelled',
+                                'jobs': 0,
+                                'elapsed': 0.0,
+                                'error': 'no free workers',
+                            }
+        finally:
+            # Do not block on abandoned sources; their threads stop at their next yield
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        return results
+
+    def export_from_queue(self, work_queue) -> Optional[Path]:
+        """
+        Export the results of a sharded crawl from its shared queue.
+
+        Args:
+            work_queue: SQLiteWorkQueue whose workers have finished
+
+        Returns:
+            Path of the JSON Lines export (the first partition file when an
+            OutputStore is used), or None on error
+        """
+        self.export_jobs(work_queue.iter_results())
+        return self.export_paths[0] if self.export_paths else None
+
+    def export_jobs(self, jobs: Iterable[Dict[str, Any]]):
+        """
+        Export jobs to a JSON Lines file.
+
+        Records are streamed from any iterable and the file is replaced
+        atomically once every record is written. With an OutputStore the
+        jobs go to a new run, partitioned by their ``source`` field.
+
+        Args:
+            jobs: Iterable of job dictionaries to export
+        """
+        sink = None
         try:
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(jobs, f, indent=2, ensure_ascii=False)
-            self.logger.info(f"Exported {len(jobs)} jobs to {output_file}")
+            with time_stage('export'):
+                sink = self._open_sink()
+                for job in jobs:
+                    if self.store is not None:
+                        sink.write(job, job.get('source') or 'all')
+                    else:
+                        sink.write(job)
+                self._publish(sink)
+            self.logger.info(f"Exported {sink.count} jobs to "
+                             f"{', '.join(str(p) for p in self.export_paths) or 'no files'}")
         except Exception as e:
             self.logger.error(f"Error exporting jobs: {str(e)}")
+            if sink is not None:
+                sink.abort()
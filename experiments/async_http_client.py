@@ -0,0 +1,175 @@
+# Async HTTP client with connection pooling and retry logic
+
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional
+
+import aiohttp
+
+from metrics import HTTP_BYTES, HTTP_LATENCY, HTTP_REQUESTS, HTTP_RETRIES, host_of
+from utils import HostRateLimiter
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+class AsyncHTTPClient:
+    """Asyncio HTTP client with keep-alive pooling, concurrency limits and retries."""
+
+    def __init__(self, max_retries: int = 3, backoff_factor: float = 2.0, timeout: int = 10,
+                 max_connections: int = 100, max_connections_per_host: int = 8,
+                 max_in_flight: int = 50, keepalive_timeout: float = 30.0,
+                 rate_limiter: Optional[HostRateLimiter] = None):
+        """
+        Initialize async HTTP client.
+
+        Args:
+            max_retries: Maximum number of retries
+            backoff_factor: Exponential backoff factor
+            timeout: Request timeout in seconds
+            max_connections: Global cap on open connections
+            max_connections_per_host: Cap on open connections to one host
+            max_in_flight: Maximum number of requests awaiting a response
+            keepalive_timeout: Seconds an idle pooled connection is kept open
+            rate_limiter: Optional per-host limiter applied to every attempt
+        """
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.rate_limiter = rate_limiter
+        self.headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+        }
+
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def open(self):
+        """Create the pooled session if it is not open yet."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.max_connections_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=300,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector, timeout=self.timeout, headers=self.headers
+            )
+
+    async def close(self):
+        """Close the session and all pooled connections."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def request(self, method: str, url: str, client_errors: bool = False,
+                      **kwargs) -> Optional[Dict]:
+        """
+        Send a request with retry logic.
+
+        The body is read inside the pooled connection so the connection can be
+        released back to the pool as soon as possible.
+
+        Args:
+            method: HTTP method
+            url: URL to fetch
+            client_errors: Return non-retryable 4xx responses instead of None,
+                so callers can tell a missing page from a failed request
+            **kwargs: Additional arguments for aiohttp.ClientSession.request
+
+        Returns:
+            Dictionary with url, status, headers and text, or None if all
+            retries failed or (without client_errors) the status was 4xx
+        """
+        await self.open()
+        host = host_of(url)
+
+        for attempt in range(self.max_retries):
+            try:
+                if self.rate_limiter is not None:
+                    await self.rate_limiter.acquire_async(url)
+                async with self._semaphore:
+                    start = time.perf_counter()
+                    async with self._session.request(method, url, **kwargs) as response:
+                        body = await response.read()
+                        HTTP_LATENCY.observe(time.perf_counter() - start, host)
+                        HTTP_REQUESTS.inc(host, str(response.status))
+                        HTTP_BYTES.inc(host, amount=len(body))
+                        if response.status in RETRYABLE_STATUSES:
+                            raise aiohttp.ClientResponseError(
+                                response.request_info, response.history,
+                                status=response.status, message=response.reason or ''
+                            )
+                        if not (client_errors and 400 <= response.status < 500):
+                            response.raise_for_status()
+                        return {
+                            'url': str(response.url),
+                            'status': response.status,
+                            'headers': dict(response.headers),
+                            'text': body.decode(response.get_encoding(), errors='replace'),
+                        }
+
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if not isinstance(e, aiohttp.ClientResponseError):
+                    HTTP_REQUESTS.inc(host, 'error')
+                if isinstance(e, aiohttp.ClientResponseError) and e.status not in RETRYABLE_STATUSES:
+                    logger.error(f"Request to {url} failed: {e}")
+                    return None
+
+                if attempt == self.max_retries - 1:
+                    logger.error(f"Failed after {self.max_retries} attempts: {e}")
+                    return None
+
+                HTTP_RETRIES.inc(host)
+                wait_time = self.backoff_factor ** attempt
+                logger.warning(f"Attempt {attempt + 1} failed, retrying in {wait_time}s: {e}")
+                await asyncio.sleep(wait_time)
+
+    async def get(self, url: str, **kwargs) -> Optional[Dict]:
+        """GET request with retry logic."""
+        return await self.request('GET', url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> Optional[Dict]:
+        """POST request with retry logic."""
+        return await self.request('POST', url, **kwargs)
+
+    async def get_many(self, urls: List[str], **kwargs) -> List[Optional[Dict]]:
+        """
+        Fetch many URLs concurrently over the shared pool.
+
+        Concurrency is bounded by ``max_in_flight`` and the connector limits,
+        so callers can pass thousands of URLs at once.
+
+        Args:
+            urls: URLs to fetch
+            **kwargs: Additional arguments for each request
+
+        Returns:
+            Responses in the same order as ``urls`` (None for failures)
+        """
+        return await asyncio.gather(*(self.get(url, **kwargs) for url in urls))
+
+
+if __name__ == "__main__":
+    # Example usage
+    async def main():
+        async with AsyncHTTPClient(max_connections_per_host=4) as client:
+            responses = await client.get_many(["https://example.com"] * 5)
+            for response in responses:
+                if response:
+                    print(f"Status: {response['status']}, length: {len(response['text'])}")
+
+    asyncio.run(main())
@@ -0,0 +1,239 @@
+# Shared Playwright browser pool for rendering and network inspection
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from playwright.async_api import async_playwright
+
+try:
+    import psutil
+except ImportError:  # Memory-based recycling is disabled without psutil
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+
+class BrowserPool:
+    """
+    Long-lived Chromium instance with a bounded number of concurrent tabs.
+
+    Launching the browser is the expensive part and is done once; every
+    borrowed tab gets a fresh browser context, which takes milliseconds and
+    guarantees that no cookies, storage or cache carry over between uses.
+    """
+
+    def __init__(self, max_pages: int = 8, max_memory_mb: Optional[float] = 2048,
+                 headless: bool = True):
+        """
+        Initialize browser pool.
+
+        Args:
+            max_pages: Maximum number of tabs open at the same time
+            max_memory_mb: Restart the browser once its child processes
+                exceed this RSS (requires psutil, None disables the check)
+            headless: Run Chromium headless
+        """
+        self.max_pages = max_pages
+        self.max_memory_mb = max_memory_mb
+        self.headless = headless
+
+        self._playwright = None
+        self._browser = None
+        self._slots = asyncio.Semaphore(max_pages)
+        self._restart_lock = asyncio.Lock()
+        self._start_lock = asyncio.Lock()
+        self._checked_out = {}  # browser -> number of borrowed tabs
+
+        self.stats = {
+            'pages_rendered': 0,
+            'browser_restarts': 0,
+            'peak_memory_mb': 0.0,
+            'started_at': None,
+        }
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def start(self):
+        """Launch Playwright and the shared browser (once, even when called concurrently)."""
+        if self._playwright is not None and self._browser is not None:
+            return
+        async with self._start_lock:
+            # Another caller may have started the pool while we waited
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+            if self._browser is None:
+                self._browser = await self._playwright.chromium.launch(headless=self.headless)
+            if self.stats['started_at'] is None:
+                self.stats['started_at'] = time.monotonic()
+
+    async def close(self):
+        """Close the browser and Playwright."""
+        if self._browser is not None:
+            await self._browser.close()
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    @asynccontextmanager
+    async def page(self):
+        """
+        Borrow a tab from the pool.
+
+        Each checkout opens a new context, so cookies, local and session
+        storage and the HTTP cache never leak between uses; the context is
+        closed on return. The caller must not close the tab itself.
+
+        Yields:
+            Playwright Page object
+        """
+        async with self._slots:
+            await self.start()
+            entry = await self._checkout()
+            try:
+                yield entry['page']
+                self.stats['pages_rendered'] += 1
+            finally:
+                await self._checkin(entry)
+
+    async def _checkout(self) -> dict:
+        """Open a tab in a new context of the current browser."""
+        browser = self._browser
+        self._checked_out[browser] = self._checked_out.get(browser, 0) + 1
+        try:
+            context = await browser.new_context()
+            page = await context.new_page()
+        except Exception:
+            self._checked_out[browser] -= 1
+            raise
+        return {'browser': browser, 'context': context, 'page': page}
+
+    async def _checkin(self, entry: dict):
+        """Close a returned tab's context and restart the browser if it grew too large."""
+        self._checked_out[entry['browser']] -= 1
+        try:
+            await entry['context'].close()
+        except Exception:
+            pass
+
+        if self._over_memory_limit():
+            await self._restart_browser()
+
+    async def _restart_browser(self):
+        """
+        Replace the browser once memory crosses the threshold.
+
+        Tabs still checked out keep a reference to the old browser; it is
+        closed when the last of them is returned.
+        """
+        async with self._restart_lock:
+            if not self._over_memory_limit():
+                return
+            logger.info("Browser memory limit exceeded, restarting Chromium")
+            old_browser = self._browser
+            self._browser = await self._playwright.chromium.launch(headless=self.headless)
+            self.stats['browser_restarts'] += 1
+            if not self._checked_out.get(old_browser):
+                self._checked_out.pop(old_browser, None)
+                await old_browser.close()
+            else:
+                asyncio.get_running_loop().create_task(self._close_when_idle(old_browser))
+
+    async def _close_when_idle(self, browser):
+        while self._checked_out.get(browser):
+            await asyncio.sleep(0.5)
+        self._checked_out.pop(browser, None)
+        await browser.close()
+
+    def memory_mb(self) -> Optional[float]:
+        """
+        Resident memory of the child (Chromium) processes of this process.
+
+        The scraper's own memory is left out, so a growing crawler process
+        does not make every check-in restart the browser.
+
+        Returns:
+            RSS in megabytes, or None when psutil is not installed
+        """
+        if psutil is None:
+            return None
+        rss = 0
+        for child in psutil.Process().children(recursive=True):
+            try:
+                rss += child.memory_info().rss
+            except psutil.Error:
+                pass
+        mb = rss / (1024 * 1024)
+        self.stats['peak_memory_mb'] = max(self.stats['peak_memory_mb'], mb)
+        return mb
+
+    def _over_memory_limit(self) -> bool:
+        if self.max_memory_mb is None:
+            return False
+        mb = self.memory_mb()
+        return mb is not None and mb > self.max_memory_mb
+
+    def report(self) -> dict:
+        """
+        Throughput and memory summary since the pool started.
+
+        Returns:
+            Dictionary with pages rendered, pages per minute and peak memory
+        """
+        self.memory_mb()
+        started = self.stats['started_at']
+        elapsed = time.monotonic() - started if started else 0.0
+        return {
+            **{k: v for k, v in self.stats.items() if k != 'started_at'},
+            'elapsed_seconds': elapsed,
+            'pages_per_minute': self.stats['pages_rendered'] / elapsed * 60 if elapsed else 0.0,
+        }
+
+
+@asynccontextmanager
+async def open_page(pool: Optional[BrowserPool] = None):
+    """
+    Borrow a tab from ``pool``, or launch a throwaway browser when no pool is given.
+
+    Args:
+        pool: Optional shared browser pool
+
+    Yields:
+        Playwright Page object
+    """
+    if pool is not None:
+        async with pool.page() as page:
+            yield page
+        return
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        try:
+            yield await browser.new_page()
+        finally:
+            await browser.close()
+
+
+if __name__ == "__main__":
+    # Example usage
+    print("Note: Requires 'pip install playwright psutil' and 'playwright install'")
+
+    async def main():
+        async with BrowserPool(max_pages=4) as pool:
+            async def title(url):
+                async with pool.page() as page:
+                    await page.goto(url)
+                    return await page.title()
+
+            print(await asyncio.gather(*(title("https://example.com") for _ in range(8))))
+            print(pool.report())
+
+    # asyncio.run(main())
@@ -0,0 +1,312 @@
+"""
+Prioritized crawl frontier with Bloom-filter URL deduplication.
+
+Holds listing, pagination and detail URLs in per-host priority queues,
+normalizes URLs so the same job reached through different search pages is
+fetched once, and limits how deep pagination is followed. Seen URLs are
+tracked in a Bloom filter and queued URLs beyond an in-memory cap spill to
+SQLite, so memory stays bounded at millions of URLs.
+"""
+
+import hashlib
+import heapq
+import itertools
+import math
+import sqlite3
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+# Lower value = fetched first
+PRIORITY_NEW_LISTING = 0
+PRIORITY_PAGINATION = 1
+PRIORITY_DETAIL = 2
+
+DEFAULT_PRIORITIES = {
+    'listing': PRIORITY_NEW_LISTING,
+    'pagination': PRIORITY_PAGINATION,
+    'detail': PRIORITY_DETAIL,
+}
+
+TRACKING_PARAMS = {'gclid', 'fbclid', 'msclkid', 'ref', 'src', 'trk', 'trackingid'}
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+# Spilled URLs moved back into memory per refill
+REFILL_BATCH = 1000
+
+
+def normalize_url(url: str, base: Optional[str] = None) -> str:
+    """
+    Canonical form of a URL for deduplication.
+
+    Resolves relative links, lowercases scheme and host, drops default
+    ports, fragments and tracking parameters (utm_*, gclid, ...), and sorts
+    the remaining query parameters.
+
+    Args:
+        url: URL or relative link
+        base: Base URL for relative links
+
+    Returns:
+        Normalized absolute URL
+
+    Raises:
+        ValueError: If the URL is not http(s) (javascript:, mailto:, tel:,
+            ...) or is malformed, e.g. has a non-numeric port
+    """
+    if base:
+        url = urljoin(base, url)
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS:
+        raise ValueError(f"Unsupported URL scheme: {url!r}")
+    host = (parts.hostname or '').lower()
+    port = parts.port
+    netloc = host if port is None or DEFAULT_PORTS.get(scheme) == port else f"{host}:{port}"
+
+    path = parts.path or '/'
+    while '//' in path:
+        path = path.replace('//', '/')
+
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith('utm_') and k.lower() not in TRACKING_PARAMS
+    )
+    return urlunsplit((scheme, netloc, path, urlencode(query), ''))
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter using double hashing over one blake2b digest."""
+
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 0.001):
+        """
+        Size the filter for an expected number of items.
+
+        Args:
+            capacity: Expected number of distinct items
+            error_rate: Target false-positive probability at capacity
+        """
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str) -> Iterable[int]:
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.num_bits for i in range(self.num_hashes))
+
+    def add(self, item: str) -> bool:
+        """
+        Add an item.
+
+        Returns:
+            True if the item was (probably) not present before
+        """
+        added = False
+        for pos in self._positions(item):
+            byte, mask = pos >> 3, 1 << (pos & 7)
+            if not self.bits[byte] & mask:
+                self.bits[byte] |= mask
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    @property
+    def memory_bytes(self) -> int:
+        return len(self.bits)
+
+
+class CrawlFrontier:
+    """Per-host priority queues with deduplication, pagination limits and disk spill."""
+
+    def __init__(self, capacity: int = 10_000_000, error_rate: float = 0.001,
+                 max_pagination_depth: int = 20, max_in_memory: int = 100_000,
+                 spill_path: Optional[str] = None, host_delay: float = 0.0):
+        """
+        Initialize crawl frontier.
+
+        Args:
+            capacity: Expected number of distinct URLs (sizes the Bloom filter)
+            error_rate: Bloom filter false-positive rate; a false positive
+                means a URL is skipped, never fetched twice
+            max_pagination_depth: Pagination pages followed from one listing
+            max_in_memory: Queued URLs kept in memory before spilling to disk
+            spill_path: SQLite file for spilled URLs (default: in-memory DB)
+            host_delay: Minimum seconds between two URLs of the same host
+        """
+        self.seen = BloomFilter(capacity, error_rate)
+        self.max_pagination_depth = max_pagination_depth
+        self.max_in_memory = max_in_memory
+        self.host_delay = host_delay
+
+        self._queues: Dict[str, List[Tuple[int, int, str, int, str]]] = {}
+        self._next_allowed: Dict[str, float] = {}
+        self._in_memory = 0
+        self._seq = itertools.count()
+        self._spill = sqlite3.connect(spill_path or ':memory:')
+        self._spill.execute(
+            "CREATE TABLE IF NOT EXISTS spill (priority INTEGER, seq INTEGER, host TEXT, "
+            "url TEXT, depth INTEGER, kind TEXT)"
+        )
+        self._spill.execute("CREATE INDEX IF NOT EXISTS spill_order ON spill (priority, seq)")
+        self._spilled = 0
+        self._spill_min = math.inf
+        self.stats = {'added': 0, 'duplicates': 0, 'too_deep': 0, 'invalid': 0, 'popped': 0}
+
+    def __len__(self) -> int:
+        return self._in_memory + self._spilled
+
+    def add(self, url: str, kind: str = 'detail', depth: int = 0,
+            priority: Optional[int] = None, base: Optional[str] = None) -> bool:
+        """
+        Enqueue a URL unless it was seen before, is too deep, or is not a
+        valid http(s) URL.
+
+        Args:
+            url: URL or relative link
+            kind: 'listing', 'pagination' or 'detail'
+            depth: Pagination depth of this URL (0 for a first listing page)
+            priority: Explicit priority (default: from ``kind``)
+            base: Base URL for relative links
+
+        Returns:
+            True if the URL was queued
+        """
+        if kind == 'pagination' and depth > self.max_pagination_depth:
+            self.stats['too_deep'] += 1
+            return False
+
+        try:
+            normalized = normalize_url(url, base)
+        except ValueError:
+            # One bad link (mailto:, a malformed port, ...) must not stop the crawl
+            self.stats['invalid'] += 1
+            return False
+        if not self.seen.add(normalized):
+            self.stats['duplicates'] += 1
+            return False
+
+        if priority is None:
+            priority = DEFAULT_PRIORITIES.get(kind, PRIORITY_DETAIL)
+        host = urlsplit(normalized).hostname or ''
+        entry = (priority, next(self._seq), normalized, depth, kind)
+
+        if self._in_memory >= self.max_in_memory:
+            self._spill.execute("INSERT INTO spill VALUES (?, ?, ?, ?, ?, ?)",
+                                (entry[0], entry[1], host, normalized, depth, kind))
+            self._spilled += 1
+            self._spill_min = min(self._spill_min, priority)
+        else:
+            heapq.heappush(self._queues.setdefault(host, []), entry)
+            self._in_memory += 1
+        self.stats['added'] += 1
+        return True
+
+    def add_links(self, urls: Iterable[str], kind: str, base: Optional[str] = None,
+                  depth: int = 0) -> int:
+        """Enqueue many links of one kind; returns how many were new."""
+        return sum(self.add(url, kind, depth, base=base) for url in urls)
+
+    def pop(self) -> Optional[Dict]:
+        """
+        Next URL to fetch.
+
+        Picks the best priority across hosts whose politeness delay has
+        passed, so hosts are interleaved instead of drained one by one.
+
+        Returns:
+            Dictionary with url, host, kind, depth and priority, or None if
+            nothing is ready (see ``next_ready_in``)
+        """
+        if self._spilled and (self._in_memory < self.max_in_memory // 2
+                              or self._spill_min < self._best_priority()):
+            self._refill()
+
+        now = time.monotonic()
+        best_host, best_entry = None, None
+        for host, queue in self._queues.items():
+            if queue and self._next_allowed.get(host, 0.0) <= now:
+                if best_entry is None or queue[0] < best_entry:
+                    best_host, best_entry = host, queue[0]
+        if best_host is None:
+            return None
+
+        priority, _, url, depth, kind = heapq.heappop(self._queues[best_host])
+        if not self._queues[best_host]:
+            del self._queues[best_host]
+        self._in_memory -= 1
+        self._next_allowed[best_host] = now + self.host_delay
+        self.stats['popped'] += 1
+        return {'url': url, 'host': best_host, 'kind': kind, 'depth': depth, 'priority': priority}
+
+    def next_ready_in(self) -> Optional[float]:
+        """Seconds until some host may be fetched again, or None if empty."""
+        if not len(self):
+            return None
+        now = time.monotonic()
+        waits = [max(0.0, self._next_allowed.get(host, 0.0) - now)
+                 for host, queue in self._queues.items() if queue]
+        return min(waits) if waits else 0.0
+
+    def _best_priority(self) -> float:
+        heads = [queue[0][0] for queue in self._queues.values() if queue]
+        return min(heads) if heads else math.inf
+
+    def _refill(self):
+        """Move the best spilled URLs back into memory."""
+        # Always pull a batch so a spilled high-priority listing is not
+        # starved behind a full in-memory queue of detail pages
+        room = max(self.max_in_memory - self._in_memory, REFILL_BATCH)
+        rows = self._spill.execute(
+            "SELECT rowid, priority, seq, host, url, depth, kind FROM spill "
+            "ORDER BY priority, seq LIMIT ?", (room,)
+        ).fetchall()
+        for _, priority, seq, host, url, depth, kind in rows:
+            heapq.heappush(self._queues.setdefault(host, []), (priority, seq, url, depth, kind))
+        self._spill.executemany("DELETE FROM spill WHERE rowid = ?", [(row[0],) for row in rows])
+        self._in_memory += len(rows)
+        self._spilled -= len(rows)
+        row = self._spill.execute("SELECT MIN(priority) FROM spill").fetchone()
+        self._spill_min = math.inf if row[0] is None else row[0]
+
+    def follow_pagination(self, current: Dict, next_urls: Iterable[str]) -> int:
+        """
+        Enqueue pagination links found on a listing page.
+
+        Args:
+            current: Entry returned by pop() for the page just fetched
+            next_urls: Pagination links on that page
+
+        Returns:
+            Number of pages queued (none beyond max_pagination_depth)
+        """
+        return self.add_links(next_urls, 'pagination', base=current['url'],
+                              depth=current['depth'] + 1)
+
+
+if __name__ == "__main__":
+    # Example usage
+    frontier = CrawlFrontier(capacity=1_000_000, max_in_memory=1000)
+    frontier.add("https://www.amazon.jobs/en/search?page=1&utm_source=x", 'listing')
+    frontier.add("https://www.amazon.jobs/en/search?utm_source=y&page=1", 'listing')
+    frontier.add_links([f"/en/jobs/{i}" for i in range(5)], 'detail',
+                       base="https://www.amazon.jobs/en/search")
+    frontier.add("https://careers.microsoft.com/jobs?page=1", 'listing')
+
+    # Non-http(s) and malformed links are skipped instead of raising
+    skipped = ["javascript:void(0)", "mailto:jobs@amazon.com", "tel:+18005550100",
+               "http://host:abc/jobs"]
+    assert frontier.add_links(skipped, 'detail', base="https://www.amazon.jobs/en/search") == 0
+    assert frontier.stats['invalid'] == len(skipped)
+
+    while (entry := frontier.pop()) is not None:
+        print(entry['priority'], entry['kind'], entry['url'])
+    print(frontier.stats, f"Bloom filter: {frontier.seen.memory_bytes} bytes")
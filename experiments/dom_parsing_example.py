@@ -1,43 +1,93 @@
 # DOM parsing example
 
+import functools
+import threading
+import time
 from bs4 import BeautifulSoup
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple, Union
 
+import soupsieve
 
-def parse_html(html: str) -> BeautifulSoup:
+from metrics import time_stage
+
+DEFAULT_PARSER = 'html.parser'
+
+# Faster backend for ExtractionPlan; lxml can build a slightly different tree
+# for malformed markup, so other callers keep html.parser unless they opt in
+try:
+    import lxml  # noqa: F401
+    FAST_PARSER = 'lxml'
+except ImportError:
+    FAST_PARSER = 'html.parser'
+
+
+_parse_lock = threading.Lock()
+_parse_calls = 0
+
+
+def parse_html(html: str, parser: Optional[str] = None) -> BeautifulSoup:
     """
     Parse HTML content into BeautifulSoup object.
     
     Args:
         html: HTML content as string
+        parser: BeautifulSoup parser backend (default: html.parser)
     
     Returns:
         BeautifulSoup object
     """
-    return BeautifulSoup(html, 'html.parser')
+    global _parse_calls
+    with _parse_lock:
+        _parse_calls += 1
+    return BeautifulSoup(html, parser or DEFAULT_PARSER)
+
+
+def parse_count() -> int:
+    """Number of documents parsed by parse_html in this process so far."""
+    with _parse_lock:
+        return _parse_calls
+
+
+def _as_soup(html: Union[str, BeautifulSoup], parser: Optional[str] = None) -> BeautifulSoup:
+    """Parse raw HTML, or pass through an already parsed document."""
+    return html if isinstance(html, BeautifulSoup) else parse_html(html, parser)
+
+
+@functools.lru_cache(maxsize=256)
+def compile_selector(selector: str):
+    """
+    Compile a CSS selector once and reuse it across documents.
+    
+    Args:
+        selector: CSS selector
+    
+    Returns:
+        Compiled soupsieve pattern
+    """
+    return soupsieve.compile(selector)
 
 
-def extract_elements(html: str, selector: str) -> List:
+def extract_elements(html: Union[str, BeautifulSoup], selector: str) -> List:
     """
     Extract elements using CSS selector.
     
     Args:
-        html: HTML content
+        html: HTML content or an already parsed document
         selector: CSS selector
     
     Returns:
         List of matching elements
     """
-    soup = parse_html(html)
-    return soup.select(selector)
+    soup = _as_soup(html)
+    return compile_selector(selector).select(soup)
 
 
-def extract_text(html: str, selector: str) -> List[str]:
+def extract_text(html: Union[str, BeautifulSoup], selector: str) -> List[str]:
     """
     Extract text content using CSS selector.
     
     Args:
-        html: HTML content
+        html: HTML content or an already parsed document
         selector: CSS selector
     
     Returns:
@@ -47,12 +97,12 @@ def extract_text(html: str, selector: str) -> List[str]:
     return [elem.get_text(strip=True) for elem in elements]
 
 
-def extract_attributes(html: str, selector: str, attribute: str) -> List[str]:
+def extract_attributes(html: Union[str, BeautifulSoup], selector: str, attribute: str) -> List[str]:
     """
     Extract attribute values using CSS selector.
     
     Args:
-        html: HTML content
+        html: HTML content or an already parsed document
         selector: CSS selector
         attribute: Attribute name to extract
     
@@ -63,6 +113,69 @@ def extract_attributes(html: str, selector: str, attribute: str) -> List[str]:
     return [elem.get(attribute) for elem in elements if elem.get(attribute)]
 
 
+class ExtractionPlan:
+    """
+    Compiled field -> selector mapping applied to one parsed document.
+    
+    Each field is either a CSS selector (its text is extracted) or a
+    ``(selector, attribute)`` tuple. Field selectors are evaluated relative
+    to every element matched by ``item_selector``, so a listing page yields
+    one record per job in a single parse.
+    """
+    
+    def __init__(self, item_selector: str,
+                 fields: Dict[str, Union[str, Tuple[str, str]]],
+                 parser: Optional[str] = None):
+        """
+        Initialize extraction plan.
+        
+        Args:
+            item_selector: CSS selector for each repeating record
+            fields: Mapping of field name to selector or (selector, attribute)
+            parser: Backend used when given raw HTML (default: lxml when
+                installed, otherwise html.parser)
+        """
+        self.item_selector = item_selector
+        self.parser = parser or FAST_PARSER
+        self.fields = dict(fields)
+        self._item = compile_selector(item_selector)
+        self._fields = []
+        for name, spec in self.fields.items():
+            selector, attribute = (spec, None) if isinstance(spec, str) else spec
+            self._fields.append((name, compile_selector(selector) if selector else None, attribute))
+    
+    def extract(self, html: Union[str, BeautifulSoup]) -> List[Dict[str, Optional[str]]]:
+        """
+        Extract all records from a document in one pass.
+        
+        Args:
+            html: HTML content or an already parsed document
+        
+        Returns:
+            List of records, with None for fields that did not match
+        """
+        with time_stage('parse'):
+            soup = _as_soup(html, self.parser)
+            return [self.extract_item(item) for item in self._item.select(soup)]
+    
+    def extract_item(self, item) -> Dict[str, Optional[str]]:
+        """
+        Apply the field selectors to a single record element.
+        
+        An empty selector refers to the record element itself.
+        """
+        record = {}
+        for name, pattern, attribute in self._fields:
+            elem = pattern.select_one(item) if pattern is not None else item
+            if elem is None:
+                record[name] = None
+            elif attribute:
+                record[name] = elem.get(attribute)
+            else:
+                record[name] = elem.get_text(strip=True)
+        return record
+
+
 def dom_to_dict(element) -> Dict:
     """
     Convert DOM element to dictionary.
@@ -81,6 +194,58 @@ def dom_to_dict(element) -> Dict:
     return result
 
 
+def benchmark_extraction(html: str, repeat: int = 20) -> Dict[str, float]:
+    """
+    Compare per-field helper calls against a single compiled plan.
+    
+    Both run on html.parser, so ``speedup`` only reflects parsing once
+    instead of per field. The plan is also timed on FAST_PARSER, which
+    shows the backend's share separately. Parse counts are read from
+    parse_count() and assume no other thread parses meanwhile.
+    
+    Args:
+        html: Listing page HTML with div.job items
+        repeat: Number of iterations
+    
+    Returns:
+        Timings in seconds and measured parse calls per page for each approach
+    """
+    fields = {'title': 'h2', 'location': '.location', 'link': ('a', 'href')}
+    plan = ExtractionPlan('div.job', fields, parser=DEFAULT_PARSER)
+    fast_plan = ExtractionPlan('div.job', fields, parser=FAST_PARSER)
+    
+    before = parse_count()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        extract_text(html, 'div.job h2')
+        extract_text(html, 'div.job .location')
+        extract_attributes(html, 'div.job a', 'href')
+    naive = time.perf_counter() - start
+    naive_parses = parse_count() - before
+    
+    before = parse_count()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        plan.extract(html)
+    planned = time.perf_counter() - start
+    plan_parses = parse_count() - before
+    
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fast_plan.extract(html)
+    fast = time.perf_counter() - start
+    
+    return {
+        'per_field_seconds': naive,
+        'per_field_parses_per_page': naive_parses / repeat,
+        'plan_seconds': planned,
+        'plan_parses_per_page': plan_parses / repeat,
+        'speedup': naive / planned if planned else 0.0,
+        'plan_fast_parser': FAST_PARSER,
+        'plan_fast_parser_seconds': fast,
+    }
+
+
 if __name__ == "__main__":
     # Example usage
     sample_html = """
@@ -100,3 +265,13 @@ if __name__ == "__main__":
     
     texts = extract_text(sample_html, "div.item h2")
     print("Extracted titles:", texts)
+    
+    plan = ExtractionPlan("div.item", {"title": "h2", "description": "p"})
+    print("Extracted records:", plan.extract(sample_html))
+    
+    listing_html = "<html><body>" + "".join(
+        f'<div class="job"><h2>Job {i}</h2><span class="location">City {i % 10}</span>'
+        f'<a href="/jobs/{i}">Apply</a></div>'
+        for i in range(500)
+    ) + "</body></html>"
+    print("Benchmark:", benchmark_extraction(listing_html, repeat=5))
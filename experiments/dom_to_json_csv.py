@@ -1,9 +1,12 @@
 # Convert DOM data to JSON and CSV
 
+import io
 import json
 import csv
-from typing import List, Dict
-from bs4 import BeautifulSoup
+from typing import Dict, Iterable, List, Optional
+
+from csv_writer import format_cell, scan_fieldnames, write_csv
+from dom_parsing_example import extract_elements
 
 
 def dom_to_json(elements: List, output_file: str = None) -> str:
@@ -35,42 +38,39 @@ def dom_to_json(elements: List, output_file: str = None) -> str:
     return json_str
 
 
-def dom_to_csv(data: List[Dict], output_file: str = None) -> str:
+def dom_to_csv(data: Iterable[Dict], output_file: str = None,
+               two_pass: bool = False) -> Optional[str]:
     """
     Convert structured data to CSV format.
     
+    Columns are the union of keys across all rows. With an output file the
+    rows are streamed to disk (gzip-compressed for a .gz path) in constant
+    memory; use csv_writer.write_csv directly when the row count is needed.
+    
     Args:
-        data: List of dictionaries
+        data: Dictionaries, or a callable returning them (for two_pass)
         output_file: Optional file path to save CSV
+        two_pass: Collect the full schema before writing (see write_csv)
     
     Returns:
-        CSV string
+        CSV string, or None when the rows were written to output_file
     """
-    if not data:
-        return ""
-    
-    keys = data[0].keys()
-    
-    csv_lines = []
-    csv_lines.append(','.join(keys))
-    
-    for row in data:
-        values = []
-        for key in keys:
-            value = row.get(key, '')
-            # Escape quotes and wrap in quotes if contains comma
-            if isinstance(value, str) and ',' in value:
-                value = f'"{value.replace(chr(34), chr(34) + chr(34))}"'
-            values.append(str(value))
-        csv_lines.append(','.join(values))
-    
-    csv_str = '\n'.join(csv_lines)
-    
     if output_file:
-        with open(output_file, 'w', newline='', encoding='utf-8') as f:
-            f.write(csv_str)
+        compress = 'gzip' if str(output_file).endswith('.gz') else None
+        write_csv(data, output_file, compress=compress, two_pass=two_pass)
+        return None
+    
+    rows = list(data() if callable(data) else data)
+    if not rows:
+        return ""
     
-    return csv_str
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    fieldnames = scan_fieldnames(rows)
+    writer.writerow(fieldnames)
+    for row in rows:
+        writer.writerow([format_cell(row.get(key)) for key in fieldnames])
+    return buffer.getvalue()
 
 
 def parse_and_export(html: str, selector: str, format: str = 'json', output_file: str = None):
@@ -78,24 +78,23 @@ def parse_and_export(html: str, selector: str, format: str = 'json', output_file
     Parse HTML and export data in specified format.
     
     Args:
-        html: HTML content
+        html: HTML content or an already parsed BeautifulSoup document
         selector: CSS selector for elements
         format: 'json' or 'csv'
         output_file: Output file path
     """
-    soup = BeautifulSoup(html, 'html.parser')
-    elements = soup.select(selector)
+    elements = extract_elements(html, selector)
     
     if format == 'json':
         return dom_to_json(elements, output_file)
     elif format == 'csv':
-        data = [
+        data = (
             {
                 'tag': elem.name,
                 'text': elem.get_text(strip=True)
             }
             for elem in elements
-        ]
+        )
         return dom_to_csv(data, output_file)
 
 
@@ -0,0 +1,261 @@
+"""
+Persistent job fingerprint store for incremental crawling.
+
+Remembers every posting by (source, job id) with a content hash, so a cycle
+can skip detail fetches for unchanged postings and emit only new, changed
+and removed jobs. A cycle's fingerprints are staged in memory and written in
+one transaction once its export is published, so an aborted export leaves
+the store as it was.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+# Fields that change on every scrape without the posting itself changing
+VOLATILE_FIELDS = {'scraped_at', 'posted_date', '_change'}
+
+
+def job_key(job: Dict[str, Any]) -> str:
+    """
+    Stable identifier for a posting.
+
+    Uses the job's own id or URL when present, otherwise a hash of its
+    title, company and location.
+    """
+    for field in ('job_id', 'id', 'url'):
+        if job.get(field):
+            return str(job[field])
+    basis = '|'.join(str(job.get(f, '')) for f in ('title', 'company', 'location'))
+    return hashlib.sha1(basis.encode('utf-8')).hexdigest()
+
+
+def content_hash(job: Dict[str, Any]) -> str:
+    """Hash of a posting's content, ignoring volatile fields."""
+    stable = {k: v for k, v in job.items() if k not in VOLATILE_FIELDS}
+    payload = json.dumps(stable, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+class FingerprintStore:
+    """SQLite-backed store of the last seen version of every posting."""
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Initialize fingerprint store.
+
+        Args:
+            path: SQLite database file (default: output/fingerprints.sqlite)
+        """
+        if path is None:
+            output_dir = Path(__file__).parent.parent / "output"
+            output_dir.mkdir(exist_ok=True)
+            path = output_dir / "fingerprints.sqlite"
+
+        self.path = str(path)
+        self._lock = threading.Lock()
+        self._cycles: Dict[str, int] = {}
+        # Per-source fingerprints of the running cycle, written by commit()
+        self._staged: Dict[str, Dict[str, Tuple[str, Optional[str], float]]] = {}
+        self._finished: Set[str] = set()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS fingerprints (
+                source TEXT NOT NULL,
+                job_id TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                record TEXT NOT NULL,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL,
+                cycle INTEGER NOT NULL,
+                PRIMARY KEY (source, job_id)
+            )
+        """)
+        self._conn.commit()
+
+    def close(self):
+        """Close the underlying database."""
+        with self._lock:
+            self._conn.close()
+
+    def begin_cycle(self, source: str) -> int:
+        """
+        Start a crawl cycle for one source.
+
+        Returns:
+            Cycle number used to detect postings that were not seen again
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COALESCE(MAX(cycle), 0) FROM fingerprints WHERE source = ?", (source,)
+            ).fetchone()
+            cycle = row[0] + 1
+            self._cycles[source] = cycle
+            self._staged[source] = {}
+            self._finished.discard(source)
+            return cycle
+
+    def previous(self, source: str, job_id: str) -> Optional[Dict[str, Any]]:
+        """Last stored version of a posting, or None if it is new."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT record FROM fingerprints WHERE source = ? AND job_id = ?",
+                (source, job_id)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def unchanged_record(self, source: str, listing: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Stored full record for a listing whose visible fields have not changed.
+
+        Scrapers call this before fetching a detail page: if it returns a
+        record, that record can be emitted as-is and the fetch skipped.
+
+        Args:
+            source: Source name
+            listing: Fields known from the listing page (title, url, ...)
+
+        Returns:
+            Previously stored record, or None if the detail page is needed
+        """
+        stored = self.previous(source, job_key(listing))
+        if stored is None:
+            return None
+        subset = {k: stored.get(k) for k in listing if k not in VOLATILE_FIELDS}
+        listed = {k: v for k, v in listing.items() if k not in VOLATILE_FIELDS}
+        return stored if content_hash(subset) == content_hash(listed) else None
+
+    def classify(self, source: str, job: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Record a posting seen in the current cycle and classify the change.
+
+        The new fingerprint is staged, not written: it reaches the database
+        only when ``commit`` is called after the export is published.
+
+        Args:
+            source: Source name (begin_cycle must have been called)
+            job: Full job record
+
+        Returns:
+            Change event: {'change': 'new'|'changed'|'unchanged', 'source',
+            'job_id', 'job'} plus 'previous' for changed postings
+        """
+        job_id = job_key(job)
+        digest = content_hash(job)
+        now = time.time()
+
+        with self._lock:
+            staged = self._staged[source]
+            if job_id in staged and staged[job_id][1] is not None:
+                row = (staged[job_id][0], staged[job_id][1])
+            else:
+                row = self._conn.execute(
+                    "SELECT content_hash, record FROM fingerprints WHERE source = ? AND job_id = ?",
+                    (source, job_id)
+                ).fetchone()
+
+            if row is None:
+                change, previous = 'new', None
+            elif row[0] != digest:
+                change, previous = 'changed', json.loads(row[1])
+            else:
+                change, previous = 'unchanged', None
+            # Unchanged postings only need last_seen and cycle bumped
+            # dict() so Mapping records such as JobRecord store their fields,
+            # not their repr
+            record = None if change == 'unchanged' else json.dumps(dict(job), ensure_ascii=False,
+                                                                   default=str)
+            staged[job_id] = (digest, record, now)
+
+        event = {'change': change, 'source': source, 'job_id': job_id, 'job': job}
+        if previous is not None:
+            event['previous'] = previous
+        return event
+
+    def end_cycle(self, source: str) -> List[Dict[str, Any]]:
+        """
+        Finish a cycle and report postings that were not seen in it.
+
+        Only call this after the source completed successfully; a failed or
+        timed-out source would otherwise report its whole catalogue as removed.
+        The removals are applied by ``commit`` together with the staged
+        fingerprints.
+
+        Returns:
+            'removed' change events carrying the last stored record
+        """
+        with self._lock:
+            seen = self._staged[source]
+            rows = self._conn.execute(
+                "SELECT job_id, record FROM fingerprints WHERE source = ?", (source,)
+            ).fetchall()
+            self._finished.add(source)
+
+        return [
+            {'change': 'removed', 'source': source, 'job_id': job_id, 'job': json.loads(record)}
+            for job_id, record in rows if job_id not in seen
+        ]
+
+    def abandon_cycle(self, source: str):
+        """Forget an unfinished cycle without removing unseen postings."""
+        with self._lock:
+            self._cycles.pop(source, None)
+            self._staged.pop(source, None)
+            self._finished.discard(source)
+
+    def commit(self, sources: Optional[Iterable[str]] = None):
+        """
+        Write finished cycles to the database in one transaction.
+
+        Call this once the export holding the cycle's change events has been
+        published; postings of committed sources that were not seen are
+        deleted. Unfinished cycles, and finished ones not listed, stay staged.
+
+        Args:
+            sources: Sources whose change events all reached the export
+                (default: every finished source). A source abandoned at its
+                deadline may still finish its cycle in the background after
+                its removal events were refused, so callers pass only the
+                sources that completed in time.
+        """
+        with self._lock:
+            committed = set(self._finished) if sources is None else self._finished & set(sources)
+            try:
+                for source in committed:
+                    cycle = self._cycles.pop(source)
+                    staged = self._staged.pop(source)
+                    self._conn.executemany(
+                        "INSERT INTO fingerprints VALUES (?, ?, ?, ?, ?, ?, ?) "
+                        "ON CONFLICT (source, job_id) DO UPDATE SET "
+                        "content_hash = excluded.content_hash, record = excluded.record, "
+                        "last_seen = excluded.last_seen, cycle = excluded.cycle",
+                        ((source, job_id, digest, record, now, now, cycle)
+                         for job_id, (digest, record, now) in staged.items() if record is not None)
+                    )
+                    self._conn.executemany(
+                        "UPDATE fingerprints SET last_seen = ?, cycle = ? "
+                        "WHERE source = ? AND job_id = ?",
+                        ((now, cycle, source, job_id)
+                         for job_id, (digest, record, now) in staged.items() if record is None)
+                    )
+                    self._conn.execute(
+                        "DELETE FROM fingerprints WHERE source = ? AND cycle < ?", (source, cycle)
+                    )
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+            finally:
+                self._finished -= committed
+
+    def rollback(self):
+        """Discard every staged cycle, e.g. when the export was aborted."""
+        with self._lock:
+            self._cycles.clear()
+            self._staged.clear()
+            self._finished.clear()
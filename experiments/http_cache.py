@@ -0,0 +1,236 @@
+# Persistent HTTP response cache with conditional revalidation
+
+import re
+import sqlite3
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+from metrics import CACHE_EVENTS
+
+MAX_AGE_RE = re.compile(r'(?:s-)?max-age\s*=\s*(\d+)', re.IGNORECASE)
+
+
+class HTTPCache:
+    """
+    On-disk HTTP cache backed by SQLite.
+
+    Stores response bodies together with their ETag / Last-Modified validators
+    and freshness lifetime. Entries are evicted least-recently-used first once
+    the total body size exceeds ``max_bytes``.
+
+    Entries are keyed by the full request URL including its query string.
+    ``stats`` counts lookups served fresh (hits), lookups that needed the
+    network (misses) and, of those, stale entries confirmed by a 304
+    (revalidated).
+    """
+
+    def __init__(self, path: Optional[str] = None, max_bytes: int = 512 * 1024 * 1024):
+        """
+        Initialize HTTP cache.
+
+        Args:
+            path: SQLite database file (default: cache/http_cache.sqlite)
+            max_bytes: Maximum total size of cached bodies
+        """
+        if path is None:
+            cache_dir = Path(__file__).parent.parent / "cache"
+            cache_dir.mkdir(exist_ok=True)
+            path = cache_dir / "http_cache.sqlite"
+
+        self.path = str(path)
+        self.max_bytes = max_bytes
+        self.stats = {'hits': 0, 'revalidated': 0, 'misses': 0, 'stores': 0, 'evictions': 0}
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                status INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                expires REAL NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)"
+        )
+        self._conn.commit()
+
+    def close(self):
+        """Close the underlying database."""
+        with self._lock:
+            self._conn.close()
+
+    def lookup(self, url: str) -> Optional[Dict]:
+        """
+        Return the cached entry for ``url`` and mark it as recently used.
+
+        Returns:
+            Dictionary with status, headers, body, etag, last_modified and
+            ``fresh`` flag, or None when the URL is not cached
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, headers, body, etag, last_modified, expires "
+                "FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                self._count('misses', 'miss')
+                return None
+            now = time.time()
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE url = ?", (now, url))
+            self._conn.commit()
+            if row[5] > now:
+                self._count('hits', 'hit')
+            else:
+                self._count('misses', 'miss')
+
+        status, headers, body, etag, last_modified, expires = row
+        return {
+            'status': status,
+            'headers': _decode_headers(headers),
+            'body': body,
+            'etag': etag,
+            'last_modified': last_modified,
+            'fresh': expires > now,
+        }
+
+    def conditional_headers(self, entry: Optional[Dict]) -> Dict[str, str]:
+        """Build If-None-Match / If-Modified-Since headers for a cached entry."""
+        headers = {}
+        if entry:
+            if entry['etag']:
+                headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def store(self, url: str, status: int, headers: Dict[str, str], body: bytes):
+        """
+        Store a response unless its Cache-Control forbids it.
+
+        Args:
+            url: Request URL
+            status: HTTP status code
+            headers: Response headers
+            body: Raw response body
+        """
+        cache_control = _header(headers, 'Cache-Control') or ''
+        if 'no-store' in cache_control.lower():
+            return
+        if (_header(headers, 'Vary') or '').strip() == '*':
+            # The response may differ for any request; it cannot be reused
+            return
+
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(url, status, headers, body, etag, last_modified, expires, size, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, status, _encode_headers(headers), body,
+                 _header(headers, 'ETag'), _header(headers, 'Last-Modified'),
+                 _expires(headers, now), len(body), now)
+            )
+            self.stats['stores'] += 1
+            self._evict()
+            self._conn.commit()
+
+    def refresh(self, url: str, headers: Dict[str, str]):
+        """Extend the freshness of an entry after a 304 Not Modified."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE responses SET expires = ?, last_access = ?, "
+                "etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified) "
+                "WHERE url = ?",
+                (_expires(headers, now), now, _header(headers, 'ETag'),
+                 _header(headers, 'Last-Modified'), url)
+            )
+            self._conn.commit()
+            self._count('revalidated', 'revalidated')
+
+    def size(self) -> int:
+        """Total size of cached bodies in bytes."""
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def _count(self, stat: str, event: str):
+        """Count a cache event in stats and metrics. Caller holds the lock."""
+        self.stats[stat] += 1
+        CACHE_EVENTS.inc(event)
+
+    def _evict(self):
+        """Drop least-recently-used entries until the size cap is met. Caller holds the lock."""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Delete the oldest entries whose running size total still lies within
+        # the excess, plus the one that crosses it, in a single statement
+        cursor = self._conn.execute(
+            "DELETE FROM responses WHERE url IN ("
+            "  SELECT url FROM ("
+            "    SELECT url, SUM(size) OVER (ORDER BY last_access, url) - size AS before "
+            "    FROM responses"
+            "  ) WHERE before < ?"
+            ")",
+            (total - self.max_bytes,)
+        )
+        self.stats['evictions'] += cursor.rowcount
+
+
+def _header(headers: Dict[str, str], name: str) -> Optional[str]:
+    """Case-insensitive header lookup."""
+    lowered = name.lower()
+    for key, value in headers.items():
+        if key.lower() == lowered:
+            return value
+    return None
+
+
+def _expires(headers: Dict[str, str], now: float) -> float:
+    """
+    Absolute expiry time from Cache-Control max-age or the Expires header.
+
+    Responses marked no-cache, or without freshness information, expire
+    immediately and are always revalidated.
+    """
+    cache_control = (_header(headers, 'Cache-Control') or '').lower()
+    if 'no-cache' in cache_control:
+        return now
+    match = MAX_AGE_RE.search(cache_control)
+    if match:
+        try:
+            age = float(_header(headers, 'Age') or 0)
+        except ValueError:
+            age = 0.0
+        return now + max(0.0, int(match.group(1)) - age)
+    expires = _header(headers, 'Expires')
+    if expires:
+        try:
+            return parsedate_to_datetime(expires).timestamp()
+        except (TypeError, ValueError):
+            return now
+    return now
+
+
+def _encode_headers(headers: Dict[str, str]) -> str:
+    return '\n'.join(f"{k}: {v}" for k, v in headers.items())
+
+
+def _decode_headers(raw: str) -> Dict[str, str]:
+    headers = {}
+    for line in raw.split('\n'):
+        if ': ' in line:
+            key, value = line.split(': ', 1)
+            headers[key] = value
+    return headers
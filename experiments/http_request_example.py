@@ -2,6 +2,12 @@
 
 import requests
 
+# Shared session so repeated calls reuse pooled keep-alive connections
+_session = requests.Session()
+_session.headers.update({
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+})
+
 
 def fetch_webpage(url: str) -> str:
     """
@@ -13,11 +19,7 @@ def fetch_webpage(url: str) -> str:
     Returns:
         Response text
     """
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-    }
-    
-    response = requests.get(url, headers=headers, timeout=10)
+    response = _session.get(url, timeout=10)
     response.raise_for_status()
     
     return response.text
@@ -33,12 +35,7 @@ def fetch_json_api(url: str) -> dict:
     Returns:
         JSON response as dictionary
     """
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-        'Accept': 'application/json'
-    }
-    
-    response = requests.get(url, headers=headers, timeout=10)
+    response = _session.get(url, headers={'Accept': 'application/json'}, timeout=10)
     response.raise_for_status()
     
     return response.json()
@@ -4,11 +4,18 @@ import requests
 import time
 from typing import Optional
 
+from http_cache import HTTPCache
+from metrics import (HTTP_BYTES, HTTP_LATENCY, HTTP_REQUESTS, HTTP_RETRIES,
+                     host_of, time_stage)
+from utils import HostRateLimiter
+
 
 class RetryableHTTPClient:
     """HTTP client with retry and backoff logic."""
     
-    def __init__(self, max_retries: int = 3, backoff_factor: float = 2.0, timeout: int = 10):
+    def __init__(self, max_retries: int = 3, backoff_factor: float = 2.0, timeout: int = 10,
+                 rate_limiter: Optional[HostRateLimiter] = None,
+                 cache: Optional[HTTPCache] = None):
         """
         Initialize retryable HTTP client.
         
@@ -16,10 +23,14 @@ class RetryableHTTPClient:
             max_retries: Maximum number of retries
             backoff_factor: Exponential backoff factor
             timeout: Request timeout in seconds
+            rate_limiter: Optional per-host limiter applied to every attempt
+            cache: Optional persistent cache for GET responses
         """
         self.max_retries = max_retries
         self.backoff_factor = backoff_factor
         self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        self.cache = cache
         
         self.session = requests.Session()
         self.session.headers.update({
@@ -30,6 +41,13 @@ class RetryableHTTPClient:
         """
         GET request with retry logic.
         
+        When a cache is configured, fresh entries are served without a
+        request and stale ones are revalidated with If-None-Match /
+        If-Modified-Since; a 304 is answered from the cache. Entries are
+        keyed by the URL with its query parameters; requests with custom
+        headers, auth or cookies bypass the cache, since their responses
+        may differ per caller.
+        
         Args:
             url: URL to fetch
             **kwargs: Additional arguments for requests.get
@@ -37,10 +55,35 @@ class RetryableHTTPClient:
         Returns:
             Response object or None if all retries failed
         """
+        with time_stage('fetch'):
+            return self._get(url, **kwargs)
+    
+    def _get(self, url: str, **kwargs) -> Optional[requests.Response]:
+        entry = None
+        key = self._cache_key(url, kwargs)
+        if key is not None:
+            entry = self.cache.lookup(key)
+            if entry and entry['fresh']:
+                return self._cached_response(key, entry)
+            if entry:
+                headers = dict(kwargs.pop('headers', None) or {})
+                headers.update(self.cache.conditional_headers(entry))
+                kwargs['headers'] = headers
+        
         for attempt in range(self.max_retries):
             try:
-                response = self.session.get(url, timeout=self.timeout, **kwargs)
+                if self.rate_limiter is not None:
+                    self.rate_limiter.acquire(url)
+                response = self._send('GET', url, **kwargs)
                 response.raise_for_status()
+                
+                if key is not None:
+                    if response.status_code == 304 and entry:
+                        self.cache.refresh(key, dict(response.headers))
+                        return self._cached_response(key, entry)
+                    if response.status_code == 200:
+                        self.cache.store(key, response.status_code,
+                                         dict(response.headers), response.content)
                 return response
             
             except requests.RequestException as e:
@@ -48,10 +91,44 @@ class RetryableHTTPClient:
                     print(f"Failed after {self.max_retries} attempts: {e}")
                     return None
                 
+                HTTP_RETRIES.inc(host_of(url))
                 wait_time = self.backoff_factor ** attempt
                 print(f"Attempt {attempt + 1} failed, retrying in {wait_time}s: {e}")
                 time.sleep(wait_time)
     
+    def _cache_key(self, url: str, kwargs: dict) -> Optional[str]:
+        """Cache key for a GET (the prepared URL), or None to bypass the cache."""
+        if self.cache is None or any(kwargs.get(k) for k in ('headers', 'auth', 'cookies')):
+            return None
+        return requests.Request('GET', url, params=kwargs.get('params')).prepare().url
+    
+    def _send(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send one attempt and record latency, status and bytes per host."""
+        host = host_of(url)
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, url, timeout=self.timeout, **kwargs)
+        except requests.RequestException:
+            HTTP_REQUESTS.inc(host, 'error')
+            raise
+        finally:
+            HTTP_LATENCY.observe(time.perf_counter() - start, host)
+        HTTP_REQUESTS.inc(host, str(response.status_code))
+        HTTP_BYTES.inc(host, amount=len(response.content))
+        return response
+    
+    @staticmethod
+    def _cached_response(url: str, entry: dict) -> requests.Response:
+        """Rebuild a requests.Response from a cache entry."""
+        response = requests.Response()
+        response.status_code = entry['status']
+        response.headers.update(entry['headers'])
+        response._content = entry['body']
+        response.url = url
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.from_cache = True
+        return response
+    
     def post(self, url: str, **kwargs) -> Optional[requests.Response]:
         """
         POST request with retry logic.
@@ -65,7 +142,9 @@ class RetryableHTTPClient:
         """
         for attempt in range(self.max_retries):
             try:
-                response = self.session.post(url, timeout=self.timeout, **kwargs)
+                if self.rate_limiter is not None:
+                    self.rate_limiter.acquire(url)
+                response = self._send('POST', url, **kwargs)
                 response.raise_for_status()
                 return response
             
@@ -74,6 +153,7 @@ class RetryableHTTPClient:
                     print(f"Failed after {self.max_retries} attempts: {e}")
                     return None
                 
+                HTTP_RETRIES.inc(host_of(url))
                 wait_time = self.backoff_factor ** attempt
                 print(f"Attempt {attempt + 1} failed, retrying in {wait_time}s: {e}")
                 time.sleep(wait_time)
@@ -87,3 +167,9 @@ if __name__ == "__main__":
     if response:
         print(f"Success! Status: {response.status_code}")
         print(f"Content length: {len(response.text)}")
+    
+    # With a persistent cache, the second fetch is served or revalidated locally
+    cached_client = RetryableHTTPClient(cache=HTTPCache())
+    for _ in range(2):
+        cached_client.get("https://example.com")
+    print(f"Cache stats: {cached_client.cache.stats}")
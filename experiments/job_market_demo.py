@@ -1,24 +1,32 @@
 # Job market data extraction demo
 
 import asyncio
-from typing import List, Dict
+import json
+from typing import List, Dict, Optional
 from datetime import datetime
 
+from async_http_client import AsyncHTTPClient
+from dom_parsing_example import extract_text, parse_html
+from job_record import JobRecord
+
 
 class JobMarketScraper:
     """Demo scraper for job market data."""
     
-    def __init__(self, rate_limit: float = 1.0):
+    def __init__(self, rate_limit: float = 1.0, client: Optional[AsyncHTTPClient] = None):
         """
         Initialize job market scraper.
         
         Args:
             rate_limit: Requests per second limit
+            client: Shared async HTTP client (created on demand if omitted)
         """
         self.rate_limit = rate_limit
+        self._owns_client = client is None
+        self.client = client or AsyncHTTPClient()
         self.jobs_data = []
     
-    async def fetch_jobs(self, url: str) -> List[Dict]:
+    async def fetch_jobs(self, url: str) -> List[JobRecord]:
         """
         Fetch job listings from URL.
         
@@ -26,33 +34,22 @@ class JobMarketScraper:
             url: URL to scrape
         
         Returns:
-            List of job dictionaries
+            List of compact job records (dict-compatible; see JobRecord)
         """
-        # Placeholder implementation
-        # In real scenario, would use requests or Playwright
         print(f"Fetching jobs from {url}")
-        
-        # Simulated data
-        jobs = [
-            {
-                'title': 'Data Engineer',
-                'company': 'Tech Corp',
-                'location': 'San Francisco, CA',
-                'salary': '$120,000 - $150,000',
-                'posted_date': datetime.now().isoformat(),
-                'url': f'{url}/job/1'
-            },
-            {
-                'title': 'Python Developer',
-                'company': 'StartupXYZ',
-                'location': 'Remote',
-                'salary': '$100,000 - $130,000',
-                'posted_date': datetime.now().isoformat(),
-                'url': f'{url}/job/2'
-            }
-        ]
-        
-        return jobs
+        response = await self.client.get(url)
+        if response is None:
+            return []
+        
+        try:
+            payload = json.loads(response['text'])
+        except ValueError:
+            print(f"Response from {url} is not JSON")
+            return []
+        
+        # Job APIs return either a bare list or {"jobs": [...]}
+        jobs = payload.get('jobs', []) if isinstance(payload, dict) else payload
+        return [JobRecord.from_dict(job) for job in jobs if isinstance(job, dict)]
     
     async def parse_job_details(self, job_url: str) -> Dict:
         """
@@ -62,17 +59,37 @@ class JobMarketScraper:
             job_url: URL of job listing
         
         Returns:
-            Detailed job information
+            Detailed job information, or an empty dict if the page could
+            not be fetched
         """
-        # Placeholder implementation
+        response = await self.client.get(job_url)
+        if response is None:
+            return {}
+        
+        soup = parse_html(response['text'])
+        title = extract_text(soup, 'h1')
+        company = extract_text(soup, '.company')
+        description = extract_text(soup, '.description')
         return {
-            'title': 'Position Title',
-            'company': 'Company Name',
-            'description': 'Job description here',
-            'requirements': ['Python', 'SQL', 'JavaScript'],
-            'benefits': ['Health Insurance', '401k', 'Remote Work']
+            'title': title[0] if title else '',
+            'company': company[0] if company else '',
+            'description': description[0] if description else '',
+            'requirements': extract_text(soup, '.requirements li'),
+            'benefits': extract_text(soup, '.benefits li')
         }
     
+    async def fetch_all_details(self, job_urls: List[str]) -> List[Dict]:
+        """
+        Fetch job details concurrently over the shared client pool.
+        
+        Args:
+            job_urls: URLs of job listings
+        
+        Returns:
+            Detailed job information in the same order as job_urls
+        """
+        return await asyncio.gather(*(self.parse_job_details(u) for u in job_urls))
+    
     async def analyze_market_trends(self, jobs: List[Dict]) -> Dict:
         """
         Analyze job market trends.
@@ -104,6 +121,40 @@ class JobMarketScraper:
             'top_skills': skills_count
         }
     
+    async def analyze_history_trends(self, store, start_date: Optional[str] = None,
+                                     end_date: Optional[str] = None) -> Dict:
+        """
+        Analyze market trends over the columnar job history.
+        
+        Reads only the location and salary columns of the matching date
+        partitions instead of re-parsing exported JSON.
+        
+        Args:
+            store: analytics.job_history.JobHistoryStore
+            start_date: Inclusive ISO start date
+            end_date: Inclusive ISO end date
+        
+        Returns:
+            Market analysis with the same keys as analyze_market_trends
+        """
+        import pyarrow.compute as pc
+        
+        table = store.scan(['location', 'salary'], start_date, end_date)
+        locations = pc.unique(
+            pc.fill_null(table.column('location').cast('string'), 'Unknown')
+        ).to_pylist()
+        salary = table.column('salary')
+        salary_listings = pc.sum(pc.and_(pc.is_valid(salary),
+                                         pc.not_equal(salary, ''))).as_py() or 0
+        
+        return {
+            'total_jobs': table.num_rows,
+            'unique_locations': len(locations),
+            'locations': locations,
+            'average_salary_listings': salary_listings,
+            'top_skills': {}
+        }
+    
     async def run(self, urls: List[str]) -> Dict:
         """
         Run complete scraping pipeline.
@@ -116,8 +167,13 @@ class JobMarketScraper:
         """
         all_jobs = []
         
-        for url in urls:
-            jobs = await self.fetch_jobs(url)
+        try:
+            results = await asyncio.gather(*(self.fetch_jobs(url) for url in urls))
+        finally:
+            if self._owns_client:
+                await self.client.close()
+        
+        for jobs in results:
             all_jobs.extend(jobs)
         
         analysis = await self.analyze_market_trends(all_jobs)
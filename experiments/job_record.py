@@ -0,0 +1,202 @@
+"""
+Compact job record type.
+
+Jobs travel through the pipeline as dicts that repeat every key and most
+values (company, location, source, skills) per posting. JobRecord stores
+the common fields in ``__slots__``, interns the low-cardinality strings so
+each distinct company or location exists once in memory, and keeps any
+other keys in a small overflow dict. It is a read-only Mapping with item
+assignment, so code written against job dicts (``job.get('skills')``,
+``for key in job``) and the exporters keep working unchanged.
+"""
+
+import json
+import sys
+import tracemalloc
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, Iterator, List
+
+# Fields stored in slots, in export order
+FIELDS = (
+    'job_id', 'title', 'company', 'location', 'source', 'url', 'salary',
+    'posted_date', 'employment_type', 'description', 'requirements', 'skills',
+)
+
+# Fields with few distinct values across postings
+INTERNED_FIELDS = frozenset({'title', 'company', 'location', 'source', 'employment_type'})
+
+_FIELD_SET = frozenset(FIELDS)
+
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if type(value) is str else value
+
+
+def _skills(value: Any) -> Any:
+    """Skills as a tuple of interned strings (shared across postings)."""
+    if isinstance(value, (list, tuple)):
+        return tuple(_intern(skill) for skill in value)
+    return _intern(value)
+
+
+class JobRecord(Mapping):
+    """Slotted job posting with interned low-cardinality fields."""
+
+    __slots__ = FIELDS + ('extra',)
+
+    def __init__(self, **fields: Any):
+        """
+        Initialize job record.
+
+        Args:
+            **fields: Job fields; unknown keys go to ``extra``
+        """
+        self._fill(fields)
+
+    def _fill(self, fields: Dict[str, Any]):
+        for name in FIELDS:
+            setattr(self, name, None)
+        self.extra = None
+        for name, value in fields.items():
+            self[name] = value
+
+    @classmethod
+    def from_dict(cls, job: Dict[str, Any]) -> 'JobRecord':
+        """Build a record from the dict shape scrapers produce."""
+        record = cls.__new__(cls)
+        record._fill(job)
+        return record
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert back to the plain dict shape.
+
+        Fields that are None are omitted, and skills come back as a list.
+        """
+        job = {}
+        for name in FIELDS:
+            value = getattr(self, name)
+            if value is not None:
+                job[name] = list(value) if name == 'skills' and isinstance(value, tuple) else value
+        if self.extra:
+            job.update(self.extra)
+        return job
+
+    def __getitem__(self, key: str) -> Any:
+        if key in _FIELD_SET:
+            value = getattr(self, key)
+            if value is not None:
+                return list(value) if key == 'skills' and isinstance(value, tuple) else value
+        elif self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any):
+        if key in _FIELD_SET:
+            if key == 'skills':
+                value = _skills(value)
+            elif key in INTERNED_FIELDS:
+                value = _intern(value)
+            setattr(self, key, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __iter__(self) -> Iterator[str]:
+        for name in FIELDS:
+            if getattr(self, name) is not None:
+                yield name
+        if self.extra:
+            yield from self.extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"JobRecord({self.to_dict()!r})"
+
+    def __reduce__(self):
+        # Slots without __dict__ pickle through the dict shape
+        return (_from_dict, (self.to_dict(),))
+
+
+def _from_dict(job: Dict[str, Any]) -> JobRecord:
+    return JobRecord.from_dict(job)
+
+
+def to_records(jobs: Iterable[Dict[str, Any]]) -> Iterator[JobRecord]:
+    """Convert any iterable of job dicts lazily."""
+    for job in jobs:
+        yield job if isinstance(job, JobRecord) else JobRecord.from_dict(job)
+
+
+def memory_per_record(jobs: List[Dict[str, Any]]) -> Dict[str, float]:
+    """
+    Measure memory per posting for dicts versus JobRecords.
+
+    Both variants are rebuilt from JSON text, as they would be when read
+    from an export, so values are not shared with ``jobs``.
+
+    Args:
+        jobs: Sample job dicts
+
+    Returns:
+        Bytes per record for each representation and the saving ratio
+    """
+    lines = [json.dumps(job) for job in jobs]
+    count = max(1, len(lines))
+
+    def allocated(build):
+        tracemalloc.start()
+        before, _ = tracemalloc.get_traced_memory()
+        records = build()
+        after, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del records
+        return (after - before) / count
+
+    dict_bytes = allocated(lambda: [json.loads(line) for line in lines])
+    record_bytes = allocated(lambda: [JobRecord.from_dict(json.loads(line)) for line in lines])
+    return {
+        'dict_bytes_per_record': dict_bytes,
+        'job_record_bytes_per_record': record_bytes,
+        'saving': 1 - record_bytes / dict_bytes if dict_bytes else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    # Example usage
+    companies = ['Google', 'Microsoft', 'Amazon']
+    locations = ['Seattle, WA', 'Mountain View, CA', 'Remote', 'New York, NY']
+    sample = [
+        {'job_id': str(i), 'title': 'Software Engineer', 'company': companies[i % 3],
+         'location': locations[i % 4], 'source': f'{companies[i % 3]}Scraper',
+         'url': f'https://careers.example.com/jobs/{i}', 'posted_date': '2026-10-01',
+         'skills': ['python', 'sql', 'aws'], 'remote_ok': i % 2 == 0}
+        for i in range(50000)
+    ]
+    record = JobRecord.from_dict(sample[0])
+    assert record.to_dict() == sample[0]
+
+    # Fingerprints store a JobRecord as its plain fields, so a later change
+    # reports the previous version as a dict
+    import tempfile
+    from pathlib import Path
+
+    from fingerprint_store import FingerprintStore, content_hash
+
+    assert content_hash(record) == content_hash(sample[0])
+    with tempfile.TemporaryDirectory() as tmp:
+        store = FingerprintStore(Path(tmp) / "fingerprints.sqlite")
+        store.begin_cycle('demo')
+        assert store.classify('demo', record)['change'] == 'new'
+        store.end_cycle('demo')
+        store.commit()
+        changed = JobRecord.from_dict({**sample[0], 'title': 'Staff Software Engineer'})
+        store.begin_cycle('demo')
+        event = store.classify('demo', changed)
+        assert event['change'] == 'changed' and event['previous'] == sample[0]
+        store.rollback()
+        store.close()
+    print(memory_per_record(sample))
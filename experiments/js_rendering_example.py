@@ -1,98 +1,110 @@
 # JavaScript rendering example using Playwright
 
 import asyncio
-from playwright.async_api import async_playwright
-from typing import Optional
+from typing import List, Optional
 
+from browser_pool import BrowserPool, open_page
+from metrics import time_stage
 
-async def render_page(url: str, wait_selector: Optional[str] = None) -> str:
+
+async def render_page(url: str, wait_selector: Optional[str] = None,
+                      pool: Optional[BrowserPool] = None) -> str:
     """
     Render page with JavaScript execution.
     
     Args:
         url: URL to render
         wait_selector: Optional selector to wait for
+        pool: Optional shared browser pool (a new browser is launched without one)
     
     Returns:
         Rendered HTML content
     """
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        page = await browser.new_page()
-        
-        try:
+    with time_stage('render'):
+        async with open_page(pool) as page:
             await page.goto(url, wait_until='networkidle')
             
             # Wait for specific element if provided
             if wait_selector:
                 await page.wait_for_selector(wait_selector)
             
-            content = await page.content()
-            return content
-        finally:
-            await browser.close()
+            return await page.content()
 
 
-async def extract_rendered_data(url: str, selector: str) -> list:
+async def render_pages(urls: List[str], pool: BrowserPool,
+                       wait_selector: Optional[str] = None) -> List[Optional[str]]:
+    """
+    Render many pages concurrently through a shared browser pool.
+    
+    Concurrency is bounded by the pool's tab limit.
+    
+    Args:
+        urls: URLs to render
+        pool: Shared browser pool
+        wait_selector: Optional selector to wait for on every page
+    
+    Returns:
+        Rendered HTML in the same order as urls (None for failures)
+    """
+    results = await asyncio.gather(
+        *(render_page(url, wait_selector, pool) for url in urls),
+        return_exceptions=True
+    )
+    return [None if isinstance(r, Exception) else r for r in results]
+
+
+async def extract_rendered_data(url: str, selector: str,
+                                pool: Optional[BrowserPool] = None) -> list:
     """
     Extract data from JavaScript-rendered content.
     
     Args:
         url: URL to scrape
         selector: CSS selector for elements
+        pool: Optional shared browser pool
     
     Returns:
         List of text content from elements
     """
     from bs4 import BeautifulSoup
     
-    html = await render_page(url)
+    html = await render_page(url, pool=pool)
     soup = BeautifulSoup(html, 'html.parser')
     elements = soup.select(selector)
     
     return [elem.get_text(strip=True) for elem in elements]
 
 
-async def take_screenshot(url: str, output_file: str):
+async def take_screenshot(url: str, output_file: str, pool: Optional[BrowserPool] = None):
     """
     Take screenshot of rendered page.
     
     Args:
         url: URL to screenshot
         output_file: Path to save screenshot
+        pool: Optional shared browser pool
     """
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        page = await browser.new_page()
-        
-        try:
-            await page.goto(url, wait_until='networkidle')
-            await page.screenshot(path=output_file)
-            print(f"Screenshot saved to {output_file}")
-        finally:
-            await browser.close()
+    async with open_page(pool) as page:
+        await page.goto(url, wait_until='networkidle')
+        await page.screenshot(path=output_file)
+        print(f"Screenshot saved to {output_file}")
 
 
-async def get_page_metrics(url: str) -> dict:
+async def get_page_metrics(url: str, pool: Optional[BrowserPool] = None) -> dict:
     """
     Get page performance metrics.
     
     Args:
         url: URL to analyze
+        pool: Optional shared browser pool
     
     Returns:
         Dictionary with metrics
     """
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        page = await browser.new_page()
-        
-        try:
-            await page.goto(url, wait_until='networkidle')
-            metrics = await page.metrics()
-            return metrics
-        finally:
-            await browser.close()
+    async with open_page(pool) as page:
+        await page.goto(url, wait_until='networkidle')
+        metrics = await page.metrics()
+        return metrics
 
 
 if __name__ == "__main__":
@@ -102,3 +114,10 @@ if __name__ == "__main__":
     
     # asyncio.run(render_page("https://example.com"))
     # asyncio.run(take_screenshot("https://example.com", "screenshot.png"))
+    
+    # Render many pages through one long-lived browser and compare throughput
+    # async def pooled():
+    #     async with BrowserPool(max_pages=4) as pool:
+    #         await render_pages(["https://example.com"] * 20, pool)
+    #         print(pool.report())
+    # asyncio.run(pooled())
@@ -0,0 +1,120 @@
+"""
+Streaming JSON Lines writer and reader.
+
+Records are appended one per line as they are produced and the file is
+published atomically with a rename, so readers never see a partial file.
+"""
+
+import gzip
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from record_codec import JSON_CODEC
+
+
+def _open_text(path, mode: str, compress: Optional[str], newline: Optional[str] = None):
+    if compress == 'gzip':
+        return gzip.open(path, mode + 't', encoding='utf-8', newline=newline)
+    if compress == 'zstd':
+        import zstandard
+        return zstandard.open(path, mode + 't', encoding='utf-8', newline=newline)
+    if compress is not None:
+        raise ValueError(f"Unsupported compression: {compress}")
+    return open(path, mode, encoding='utf-8', newline=newline)
+
+
+class JSONLinesWriter:
+    """Thread-safe, atomically published JSON Lines writer."""
+
+    def __init__(self, path, compress: Optional[str] = None):
+        """
+        Initialize JSON Lines writer.
+
+        Args:
+            path: Final output path
+            compress: None, 'gzip' or 'zstd' (needs the zstandard package)
+        """
+        self.path = Path(path)
+        self.compress = compress
+        self.count = 0
+        self._lock = threading.Lock()
+        self._file = None
+        self._tmp_path = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def open(self):
+        """Start writing to a temporary file next to the final path."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix=f".{self.path.name}.", suffix='.tmp',
+                                   dir=self.path.parent)
+        os.close(fd)
+        self._tmp_path = Path(tmp)
+        self._file = _open_text(self._tmp_path, 'w', self.compress)
+
+    def write(self, record: Dict[str, Any]):
+        """Append one record."""
+        line = JSON_CODEC.dumps(record)
+        with self._lock:
+            if self._file is None:
+                raise ValueError(f"Writer for {self.path} is closed")
+            self._file.write(line)
+            self._file.write('\n')
+            self.count += 1
+
+    def write_many(self, records: Iterable[Dict[str, Any]]):
+        """Append records from any iterable without materializing it."""
+        for record in records:
+            self.write(record)
+
+    def close(self):
+        """Flush, fsync and atomically move the file into place."""
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.close()
+            self._file = None
+            fd = os.open(self._tmp_path, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+            os.replace(self._tmp_path, self.path)
+
+    def abort(self):
+        """Discard the temporary file, leaving any previous output intact."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            if self._tmp_path is not None and self._tmp_path.exists():
+                self._tmp_path.unlink()
+
+
+def iter_jsonl(path) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily read records from a JSON Lines file (gzip/zstd detected by suffix).
+
+    Args:
+        path: File to read
+
+    Yields:
+        One record per non-empty line
+    """
+    path = Path(path)
+    compress = {'.gz': 'gzip', '.zst': 'zstd'}.get(path.suffix)
+    with _open_text(path, 'r', compress) as f:
+        for line in f:
+            if line.strip():
+                yield JSON_CODEC.decode(line)
@@ -18,6 +18,8 @@ class MicrosoftCareersScraper:
     def __init__(self):
         """Initialize the Microsoft Careers scraper."""
         self.logger = logger
+        # Set by AggregatedScraper in incremental mode
+        self.fingerprints = None
 
     def scrape(self) -> List[Dict[str, Any]]:
         """
@@ -31,6 +33,8 @@ class MicrosoftCareersScraper:
 
         try:
             # Scraping logic here
+            # In incremental mode, reuse self.fingerprints.unchanged_record(
+            #     self.__class__.__name__, listing) instead of fetching details
             self.logger.info("Microsoft Careers scraping completed")
         except Exception as e:
             self.logger.error(f"Error scraping Microsoft Careers: {str(e)}")
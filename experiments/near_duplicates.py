@@ -0,0 +1,320 @@
+"""
+Near-duplicate job detection with MinHash and LSH banding.
+
+The same role is often posted once per location, and again through
+aggregators, with small wording differences. Each posting is reduced to a
+MinHash signature over word shingles of its company, title, location,
+skills and description; signatures are split into bands, and only postings
+sharing a band bucket are compared, so clustering stays sub-quadratic. Each
+cluster keeps one canonical record that lists the sources of the postings
+merged into it. Postings whose description is missing or too short to
+compare (listing-only or boilerplate text) are never merged.
+"""
+
+import hashlib
+import random
+import re
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Set, Tuple
+
+from fingerprint_store import job_key
+from job_record import JobRecord
+
+_WORD = re.compile(r'\w+')
+
+
+def shingles(text: str, size: int = 3) -> Set[int]:
+    """
+    Hashed word shingles of a text.
+
+    Args:
+        text: Free text
+        size: Words per shingle
+
+    Returns:
+        Set of 64-bit shingle hashes (a single shingle for short texts,
+        empty for texts without words)
+    """
+    words = _WORD.findall(text.lower())
+    if not words:
+        return set()
+    grams = (' '.join(words[i:i + size]) for i in range(max(1, len(words) - size + 1)))
+    return {int.from_bytes(hashlib.blake2b(gram.encode('utf-8'), digest_size=8).digest(), 'big')
+            for gram in grams}
+
+
+def posting_text(job: Dict[str, Any], description: bool = True) -> str:
+    """
+    Text compared between postings.
+
+    Title and description carry the role; company, location and skills are
+    included so that the same title at different employers or offices only
+    merges when the descriptions agree closely.
+
+    Args:
+        job: Job record
+        description: Include the description
+    """
+    skills = job.get('skills')
+    if isinstance(skills, (list, tuple)):
+        skills = ' '.join(str(skill) for skill in skills)
+    parts = [job.get('company'), job.get('title'), job.get('location'), skills]
+    if description:
+        parts.append(job.get('description'))
+    return ' '.join(str(part or '') for part in parts)
+
+
+class MinHasher:
+    """
+    MinHash signatures over hashed shingles.
+
+    Shingle hashes are already uniformly mixed, so each hash function is an
+    XOR with a random 64-bit mask, which avoids big-integer arithmetic.
+    """
+
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        """
+        Initialize MinHasher.
+
+        Args:
+            num_perm: Signature length
+            seed: Seed for the hash family (signatures are only comparable
+                between hashers with the same seed and length)
+        """
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self._masks = [rng.getrandbits(64) for _ in range(num_perm)]
+
+    def signature(self, hashes: Iterable[int]) -> Tuple[int, ...]:
+        """
+        MinHash signature of a shingle set.
+
+        Args:
+            hashes: Shingle hashes (see shingles); must not be empty
+
+        Returns:
+            Tuple of num_perm minimum hash values
+        """
+        values = list(hashes)
+        return tuple(min(map(mask.__xor__, values)) for mask in self._masks)
+
+
+def similarity(left: Tuple[int, ...], right: Tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(1 for a, b in zip(left, right) if a == b) / len(left)
+
+
+class _Cluster:
+    """One group of near-duplicate postings."""
+
+    __slots__ = ('record', 'source', 'signature', 'rank', 'duplicates')
+
+    def __init__(self, record: JobRecord, source: str, signature, rank):
+        self.record = record
+        self.source = source
+        self.signature = signature
+        self.rank = rank
+        self.duplicates: List[Tuple[str, str]] = []
+
+
+def _rank(job: Dict[str, Any], source: str) -> Tuple:
+    # Prefer the most complete posting; source and id break ties, so the
+    # choice does not depend on which source finished first
+    filled = sum(1 for value in job.values() if value not in (None, '', [], {}))
+    return (-len(job.get('description') or ''), -filled, source, job_key(job))
+
+
+class NearDuplicateIndex:
+    """
+    Thread-safe LSH index that clusters postings as they arrive.
+
+    Only canonical records are kept (as compact JobRecords); a merged
+    posting contributes just its source and id. With the defaults (64
+    hashes in 16 bands of 4) pairs above roughly 0.5 similarity become
+    candidates, and candidates are merged when their estimated similarity
+    reaches ``threshold``.
+
+    A posting whose description has fewer than ``min_description_shingles``
+    distinct shingles always stays its own cluster: company and title alone
+    ("Software Engineer" at Google) do not show that two postings are the
+    same job.
+    """
+
+    def __init__(self, threshold: float = 0.7, num_perm: int = 64, bands: int = 16,
+                 shingle_size: int = 3, seed: int = 1, min_description_shingles: int = 10):
+        """
+        Initialize the index.
+
+        Args:
+            threshold: Estimated Jaccard similarity at which postings merge
+            num_perm: MinHash signature length
+            bands: LSH bands; must divide num_perm
+            shingle_size: Words per shingle
+            seed: Hash family seed
+            min_description_shingles: Distinct description shingles a
+                posting needs before it can be merged
+        """
+        if num_perm % bands:
+            raise ValueError("bands must divide num_perm")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.min_description_shingles = min_description_shingles
+        self.hasher = MinHasher(num_perm, seed)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Forget all postings, e.g. before the next scrape."""
+        with self._lock:
+            self._clusters: List[_Cluster] = []
+            self._buckets: List[Dict[int, List[int]]] = [
+                {} for _ in range(self.bands)
+            ]
+            self.seen = 0
+
+    def _band_keys(self, signature: Tuple[int, ...]) -> List[int]:
+        # Buckets are keyed by the hash of each band; a collision only adds
+        # a candidate, which the similarity check then rejects
+        rows = self.rows
+        return [hash(signature[i * rows:(i + 1) * rows]) for i in range(self.bands)]
+
+    def add(self, job: Dict[str, Any], source: str) -> bool:
+        """
+        Add a posting.
+
+        Args:
+            job: Job record
+            source: Name of the source that produced it
+
+        Returns:
+            True if it started a new cluster, False if it was merged
+        """
+        hashes = shingles(str(job.get('description') or ''), self.shingle_size)
+        if len(hashes) >= self.min_description_shingles:
+            hashes |= shingles(posting_text(job, description=False), self.shingle_size)
+            signature = self.hasher.signature(hashes)
+        else:
+            signature = None
+        record = job if isinstance(job, JobRecord) else JobRecord.from_dict(job)
+        rank = _rank(job, source)
+
+        with self._lock:
+            self.seen += 1
+            if signature is None:
+                # Too little description to compare on; keep the posting as
+                # its own cluster and out of the buckets
+                self._clusters.append(_Cluster(record, source, None, rank))
+                return True
+
+            keys = self._band_keys(signature)
+            best, best_score = None, self.threshold
+            checked = set()
+            for band, key in enumerate(keys):
+                for index in self._buckets[band].get(key, ()):
+                    if index in checked:
+                        continue
+                    checked.add(index)
+                    score = similarity(signature, self._clusters[index].signature)
+                    if score >= best_score:
+                        best, best_score = index, score
+
+            if best is None:
+                best = len(self._clusters)
+                self._clusters.append(_Cluster(record, source, signature, rank))
+                started = True
+            else:
+                cluster = self._clusters[best]
+                if rank < cluster.rank:
+                    cluster.duplicates.append((cluster.source, job_key(cluster.record)))
+                    cluster.record, cluster.source = record, source
+                    cluster.signature, cluster.rank = signature, rank
+                else:
+                    cluster.duplicates.append((source, job_key(record)))
+                started = False
+
+            # Index every member, so postings close to any of them find the cluster
+            for band, key in enumerate(keys):
+                members = self._buckets[band].setdefault(key, [])
+                if not members or members[-1] != best:
+                    members.append(best)
+            return started
+
+    def records(self) -> Iterator[Tuple[JobRecord, str]]:
+        """
+        Canonical records with their duplicates attached.
+
+        Records that absorbed duplicates gain ``duplicate_sources`` and
+        ``duplicate_ids`` (sorted, one entry per merged posting).
+
+        Yields:
+            (record, source) in first-seen order
+        """
+        with self._lock:
+            clusters = list(self._clusters)
+        for cluster in clusters:
+            record = cluster.record
+            if cluster.duplicates:
+                duplicates = sorted(cluster.duplicates)
+                record['duplicate_sources'] = [source for source, _ in duplicates]
+                record['duplicate_ids'] = [job_id for _, job_id in duplicates]
+            yield record, cluster.source
+
+    def stats(self) -> Dict[str, int]:
+        """Postings seen, clusters kept and postings merged away."""
+        with self._lock:
+            return {'seen': self.seen, 'unique': len(self._clusters),
+                    'duplicates': self.seen - len(self._clusters)}
+
+
+def dedupe(jobs: Iterable[Dict[str, Any]], threshold: float = 0.7,
+           source_field: str = 'source') -> List[JobRecord]:
+    """
+    Collapse near-duplicate postings in a batch.
+
+    Args:
+        jobs: Job records
+        threshold: Estimated Jaccard similarity at which postings merge
+        source_field: Field naming each posting's source
+
+    Returns:
+        Canonical records in first-seen order
+    """
+    index = NearDuplicateIndex(threshold)
+    for job in jobs:
+        index.add(job, str(job.get(source_field) or ''))
+    return [record for record, _ in index.records()]
+
+
+if __name__ == "__main__":
+    # Example usage
+    description = ("Design and build large scale data pipelines in Python and SQL on AWS. "
+                   "Work with product teams on analytics, reporting and machine learning. ")
+    sample = [
+        {'job_id': '1', 'title': 'Data Engineer', 'company': 'Example Corp',
+         'location': 'Seattle, WA', 'source': 'ExampleCareers', 'description': description * 3},
+        {'job_id': '2', 'title': 'Data Engineer', 'company': 'Example Corp',
+         'location': 'Austin, TX', 'source': 'ExampleCareers',
+         'description': description * 3 + 'Relocation available.'},
+        {'job_id': 'agg-9', 'title': 'Data Engineer (Remote)', 'company': 'Example Corp',
+         'location': 'Remote', 'source': 'JobBoard', 'description': description * 3},
+        {'job_id': '3', 'title': 'Frontend Developer', 'company': 'Example Corp',
+         'location': 'Seattle, WA', 'source': 'ExampleCareers',
+         'description': 'Build React interfaces for customer dashboards.'},
+    ]
+    for job in dedupe(sample):
+        print(job['job_id'], job['title'], job.get('duplicate_sources', []))
+
+    # Listing-only postings with the same title in different offices stay apart
+    listing_only = [
+        {'job_id': f'g{i}', 'title': 'Software Engineer', 'company': 'Google',
+         'location': location, 'source': 'GoogleCareersScraper'}
+        for i, location in enumerate(['Mountain View, CA', 'Seattle, WA', 'New York, NY',
+                                      'Austin, TX', 'London, UK'])
+    ]
+    assert len(dedupe(listing_only)) == len(listing_only)
+    # So do postings that share only a short boilerplate description
+    boilerplate = [dict(job, description='Build reliable data systems. ' * 5)
+                   for job in listing_only]
+    assert len(dedupe(boilerplate)) == len(boilerplate)
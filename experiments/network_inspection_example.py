@@ -1,15 +1,32 @@
 # Network inspection example
 
 import asyncio
-from playwright.async_api import async_playwright
+import re
+from typing import Any, Dict, List, Optional, Union
+from urllib.parse import urlsplit
 
+from browser_pool import BrowserPool, open_page
+from metrics import time_stage
 
-async def capture_network_requests(url: str) -> list:
+# Resource types a JSON-intercepting crawl never needs
+BLOCKED_RESOURCE_TYPES = frozenset({'image', 'font', 'media', 'stylesheet'})
+
+# Hosts (and their subdomains) serving analytics, ads and tag managers
+ANALYTICS_HOSTS = (
+    'google-analytics.com', 'googletagmanager.com', 'doubleclick.net',
+    'facebook.net', 'hotjar.com', 'segment.io', 'segment.com',
+    'newrelic.com', 'nr-data.net', 'optimizely.com', 'bat.bing.com',
+    'px.ads.linkedin.com', 'adobedtm.com', 'omtrdc.net', 'demdex.net',
+)
+
+
+async def capture_network_requests(url: str, pool: Optional[BrowserPool] = None) -> list:
     """
     Capture all network requests made by page.
     
     Args:
         url: URL to monitor
+        pool: Optional shared browser pool
     
     Returns:
         List of request details
@@ -24,24 +41,23 @@ async def capture_network_requests(url: str) -> list:
             'headers': dict(request.headers)
         })
     
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        page = await browser.new_page()
+    async with open_page(pool) as page:
         page.on("request", handle_request)
-        
         try:
             await page.goto(url, wait_until='networkidle')
             return requests_list
         finally:
-            await browser.close()
+            # Pooled pages are reused, so listeners must not outlive this call
+            page.remove_listener("request", handle_request)
 
 
-async def monitor_api_calls(url: str) -> list:
+async def monitor_api_calls(url: str, pool: Optional[BrowserPool] = None) -> list:
     """
     Monitor API/AJAX calls made by JavaScript.
     
     Args:
         url: URL to monitor
+        pool: Optional shared browser pool
     
     Returns:
         List of API call details
@@ -63,24 +79,22 @@ async def monitor_api_calls(url: str) -> list:
                 'body_preview': body[:200] if body else None
             })
     
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        page = await browser.new_page()
+    async with open_page(pool) as page:
         page.on("response", handle_response)
-        
         try:
             await page.goto(url, wait_until='networkidle')
             return api_calls
         finally:
-            await browser.close()
+            page.remove_listener("response", handle_response)
 
 
-async def get_network_waterfall(url: str) -> dict:
+async def get_network_waterfall(url: str, pool: Optional[BrowserPool] = None) -> dict:
     """
     Analyze network timing and performance.
     
     Args:
         url: URL to analyze
+        pool: Optional shared browser pool
     
     Returns:
         Network timing information
@@ -97,11 +111,8 @@ async def get_network_waterfall(url: str) -> dict:
             'type': request.resource_type
         })
     
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        page = await browser.new_page()
+    async with open_page(pool) as page:
         page.on("request", handle_request)
-        
         try:
             start_time = asyncio.get_event_loop().time()
             await page.goto(url, wait_until='networkidle')
@@ -110,7 +121,184 @@ async def get_network_waterfall(url: str) -> dict:
             timing_data['total_time'] = end_time - start_time
             return timing_data
         finally:
-            await browser.close()
+            page.remove_listener("request", handle_request)
+
+
+def is_blocked_request(request, blocked_types=BLOCKED_RESOURCE_TYPES,
+                       blocked_hosts=ANALYTICS_HOSTS) -> bool:
+    """
+    Whether a request is dead weight when only API data is wanted.
+    
+    Args:
+        request: Playwright request
+        blocked_types: Resource types to block
+        blocked_hosts: Hosts to block, including their subdomains
+    
+    Returns:
+        True if the request should be aborted
+    """
+    if request.resource_type in blocked_types:
+        return True
+    host = (urlsplit(request.url).hostname or '').lower()
+    return any(host == blocked or host.endswith('.' + blocked) for blocked in blocked_hosts)
+
+
+def lookup_path(data: Any, path: str) -> Any:
+    """
+    Follow a dotted path such as 'locations.0.name' through JSON data.
+    
+    Args:
+        data: Decoded JSON
+        path: Dotted path; integer parts index into lists
+    
+    Returns:
+        Value at the path, or None if any step is missing
+    """
+    if not path:
+        return data
+    for part in path.split('.'):
+        if isinstance(data, dict):
+            data = data.get(part)
+        elif isinstance(data, list) and part.lstrip('-').isdigit():
+            index = int(part)
+            data = data[index] if -len(data) <= index < len(data) else None
+        else:
+            return None
+        if data is None:
+            return None
+    return data
+
+
+class ApiJobMapping:
+    """Maps a careers site's JSON API payload to job records."""
+    
+    def __init__(self, url_pattern: str, records_path: str,
+                 fields: Dict[str, str], source: Optional[str] = None):
+        """
+        Initialize mapping.
+        
+        Args:
+            url_pattern: Regex matched (searched) against response URLs
+            records_path: Dotted path to the list of jobs in the payload
+            fields: Job field name -> dotted path inside one API record
+            source: Optional source name stamped on each job
+        """
+        self.url_pattern = re.compile(url_pattern)
+        self.records_path = records_path
+        self.fields = fields
+        self.source = source
+    
+    def matches(self, url: str) -> bool:
+        return self.url_pattern.search(url) is not None
+    
+    def map(self, payload: Any) -> List[Dict]:
+        """
+        Convert one API payload into job records.
+        
+        Args:
+            payload: Decoded JSON response body
+        
+        Returns:
+            List of job dictionaries
+        """
+        records = lookup_path(payload, self.records_path)
+        if isinstance(records, dict):
+            records = [records]
+        if not isinstance(records, list):
+            return []
+        
+        jobs = []
+        for record in records:
+            job = {field: lookup_path(record, path) for field, path in self.fields.items()}
+            if self.source:
+                job['source'] = self.source
+            jobs.append(job)
+        return jobs
+
+
+async def intercept_api_jobs(url: str, mapping: ApiJobMapping,
+                             pool: Optional[BrowserPool] = None,
+                             wait_until: str = 'networkidle',
+                             block: bool = True) -> List[Dict]:
+    """
+    Extract jobs from the JSON a careers SPA loads, skipping DOM parsing.
+    
+    Images, fonts, media and analytics requests are aborted, and every
+    JSON response matching the mapping is captured in full and mapped to
+    job records.
+    
+    Args:
+        url: Page that triggers the API calls
+        mapping: Which responses to capture and how to map them
+        pool: Optional shared browser pool
+        wait_until: Navigation event to wait for before collecting
+        block: Abort resources that are not needed for the API data
+    
+    Returns:
+        List of job dictionaries in response order
+    """
+    pending: List[asyncio.Task] = []
+    
+    async def handle_route(route):
+        if is_blocked_request(route.request):
+            await route.abort()
+        else:
+            await route.continue_()
+    
+    async def capture(response):
+        try:
+            return mapping.map(await response.json())
+        except Exception:
+            # Redirects, empty bodies and non-JSON responses carry no jobs
+            return []
+    
+    def handle_response(response):
+        if response.ok and mapping.matches(response.url):
+            pending.append(asyncio.ensure_future(capture(response)))
+    
+    with time_stage('intercept'):
+        async with open_page(pool) as page:
+            if block:
+                await page.route("**/*", handle_route)
+            page.on("response", handle_response)
+            batches = []
+            try:
+                await page.goto(url, wait_until=wait_until)
+                # Responses may keep arriving while earlier ones are read
+                while pending:
+                    current = pending[:]
+                    del pending[:]
+                    batches.extend(await asyncio.gather(*current))
+            finally:
+                page.remove_listener("response", handle_response)
+                # Nothing may keep reading from the page once it is back in the pool
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+                if block:
+                    await page.unroute("**/*", handle_route)
+    
+    return [job for batch in batches for job in batch]
+
+
+async def intercept_many(urls: List[str], mapping: ApiJobMapping,
+                         pool: BrowserPool) -> List[Union[List[Dict], None]]:
+    """
+    Intercept API jobs for many pages through a shared browser pool.
+    
+    Args:
+        urls: Pages to load
+        mapping: Response mapping shared by all pages
+        pool: Shared browser pool
+    
+    Returns:
+        Job lists in the same order as urls (None for failures)
+    """
+    results = await asyncio.gather(
+        *(intercept_api_jobs(url, mapping, pool) for url in urls),
+        return_exceptions=True
+    )
+    return [None if isinstance(r, Exception) else r for r in results]
 
 
 if __name__ == "__main__":
@@ -119,3 +307,14 @@ if __name__ == "__main__":
     
     # result = asyncio.run(capture_network_requests("https://example.com"))
     # print(f"Captured {len(result)} requests")
+    
+    # Read jobs straight from a careers site's search API
+    # mapping = ApiJobMapping(
+    #     url_pattern=r"/api/.*search",
+    #     records_path="jobs",
+    #     fields={'job_id': 'id', 'title': 'title', 'location': 'locations.0.name',
+    #             'url': 'url', 'posted_date': 'postedDate'},
+    #     source='example',
+    # )
+    # jobs = asyncio.run(intercept_api_jobs("https://careers.example.com/search", mapping))
+    # print(f"Intercepted {len(jobs)} jobs")
@@ -0,0 +1,409 @@
+"""
+Date-partitioned, compressed output store.
+
+Every run writes its own files under
+``<dataset>/source=<source>/date=<YYYY-MM-DD>/part-<run_id>.<ext>`` instead
+of overwriting output/jobs.jsonl or output/skill_trends.csv, so history
+is kept cheaply. Completed runs are appended to ``manifest.jsonl``, each
+dataset keeps a ``LATEST.json`` pointer to the newest file per source
+(sources a run completed without records are dropped from it), and
+``compact`` merges old partitions and drops those beyond retention.
+"""
+
+import contextlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from csv_writer import CSVWriter
+from jsonl_writer import JSONLinesWriter
+from record_codec import FramedWriter, iter_records
+
+try:
+    import fcntl
+except ImportError:  # Cross-process manifest locking is POSIX-only
+    fcntl = None
+
+try:
+    import zstandard  # noqa: F401
+    DEFAULT_COMPRESSION = 'zstd'
+except ImportError:
+    DEFAULT_COMPRESSION = 'gzip'
+
+logger = logging.getLogger(__name__)
+
+COMPRESSION_SUFFIX = {None: '', 'gzip': '.gz', 'zstd': '.zst'}
+WRITERS = {'jsonl': JSONLinesWriter, 'frames': FramedWriter, 'csv': CSVWriter}
+RECORD_FORMATS = ('jsonl', 'frames')
+
+
+def _write_json_atomic(path: Path, data: Any):
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{path.name}.", suffix='.tmp', dir=path.parent)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class StoreRun:
+    """Files written by one run of one dataset, published together on commit."""
+
+    def __init__(self, store: 'OutputStore', dataset: str, fmt: str, run_id: str,
+                 run_date: str):
+        self.store = store
+        self.dataset = dataset
+        self.format = fmt
+        self.run_id = run_id
+        self.date = run_date
+        self._writers: Dict[str, Any] = {}
+        self._covered = set()
+        self._lock = threading.Lock()
+        self._finished = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+
+    def path_for(self, source: str) -> Path:
+        """Partition file this run writes for a source."""
+        suffix = f".{self.format}{COMPRESSION_SUFFIX[self.store.compress]}"
+        return (self.store.root / self.dataset / f"source={source}" / f"date={self.date}"
+                / f"part-{self.run_id}{suffix}")
+
+    def writer(self, source: str = 'all', fieldnames: Optional[Sequence[str]] = None):
+        """
+        Open (once) and return the writer for a source partition.
+
+        Args:
+            source: Partition source name
+            fieldnames: Known CSV columns, so an empty report still has a header
+        """
+        with self._lock:
+            if self._finished:
+                raise ValueError(f"Run {self.run_id} is already finished")
+            writer = self._writers.get(source)
+            if writer is None:
+                options = {'fieldnames': fieldnames} if self.format == 'csv' else {}
+                writer = WRITERS[self.format](self.path_for(source), compress=self.store.compress,
+                                              **options)
+                writer.open()
+                self._writers[source] = writer
+            return writer
+
+    def cover(self, source: str):
+        """
+        Mark a source as fully produced by this run, even if it wrote nothing.
+
+        On commit, covered sources without records are dropped from LATEST
+        instead of keeping the previous run's file as their current view.
+        """
+        with self._lock:
+            self._covered.add(source)
+
+    def write(self, record: Dict[str, Any], source: str = 'all'):
+        """Append one record to the source's partition."""
+        self.writer(source).write(record)
+
+    @property
+    def count(self) -> int:
+        return sum(writer.count for writer in self._writers.values())
+
+    @property
+    def paths(self) -> List[Path]:
+        return [writer.path for writer in self._writers.values()]
+
+    def commit(self) -> Dict[str, Any]:
+        """
+        Publish all partition files, record the run and move LATEST.
+
+        Returns:
+            Manifest entry for this run
+        """
+        with self._lock:
+            self._finished = True
+        files = []
+        for source, writer in self._writers.items():
+            writer.close()
+            files.append({
+                'source': source,
+                'path': writer.path.relative_to(self.store.root).as_posix(),
+                'records': writer.count,
+                'bytes': writer.path.stat().st_size,
+            })
+        entry = {
+            'run_id': self.run_id,
+            'dataset': self.dataset,
+            'format': self.format,
+            'date': self.date,
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'records': sum(f['records'] for f in files),
+            'bytes': sum(f['bytes'] for f in files),
+            'files': files,
+            'cleared': sorted(self._covered - set(self._writers)),
+        }
+        self.store._record_run(entry)
+        return entry
+
+    def abort(self):
+        """Discard everything this run wrote."""
+        with self._lock:
+            self._finished = True
+        for writer in self._writers.values():
+            writer.abort()
+
+
+class OutputStore:
+    """Partitioned run history with a manifest and per-dataset latest pointers."""
+
+    def __init__(self, root: Optional[Path] = None,
+                 compress: Optional[str] = DEFAULT_COMPRESSION):
+        """
+        Initialize output store.
+
+        Args:
+            root: Store directory (default: output/store)
+            compress: None, 'gzip' or 'zstd' (default: zstd when the
+                zstandard package is installed, otherwise gzip)
+        """
+        if compress not in COMPRESSION_SUFFIX:
+            raise ValueError(f"Unsupported compression: {compress}")
+        self.root = Path(root) if root else Path(__file__).parent.parent / "output" / "store"
+        self.compress = compress
+        self.logger = logger
+        self.manifest_path = self.root / "manifest.jsonl"
+        self._lock = threading.Lock()
+
+    def begin_run(self, dataset: str, fmt: str = 'jsonl',
+                  run_id: Optional[str] = None) -> StoreRun:
+        """
+        Start writing a new run of a dataset.
+
+        Args:
+            dataset: Dataset name, e.g. 'jobs', 'changes' or 'skill_trends'
+            fmt: 'jsonl', 'frames' (length-prefixed binary records) or 'csv'
+            run_id: Optional run identifier (default: UTC timestamp + random suffix)
+
+        Returns:
+            StoreRun; use as a context manager or call commit()/abort()
+        """
+        if fmt not in WRITERS:
+            raise ValueError(f"Unsupported format: {fmt}")
+        now = datetime.now(timezone.utc)
+        run_id = run_id or f"{now:%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+        return StoreRun(self, dataset, fmt, run_id, now.date().isoformat())
+
+    @contextlib.contextmanager
+    def _locked(self):
+        """Exclusive manifest lock across threads and processes."""
+        with self._lock:
+            self.root.mkdir(parents=True, exist_ok=True)
+            with open(self.root / ".manifest.lock", 'w') as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                yield
+
+    def _latest_path(self, dataset: str) -> Path:
+        return self.root / dataset / "LATEST.json"
+
+    def _record_run(self, entry: Dict[str, Any]):
+        with self._locked():
+            with open(self.manifest_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            latest_path = self._latest_path(entry['dataset'])
+            latest_path.parent.mkdir(parents=True, exist_ok=True)
+            latest = self.latest(entry['dataset'])
+            for file in entry['files']:
+                latest[file['source']] = {'run_id': entry['run_id'], **file}
+            for source in entry.get('cleared', ()):
+                latest.pop(source, None)
+            _write_json_atomic(latest_path, latest)
+        self.logger.info(f"Stored {entry['records']} {entry['dataset']} records "
+                         f"({entry['bytes']} bytes) as run {entry['run_id']}")
+
+    def manifest(self, dataset: Optional[str] = None) -> List[Dict[str, Any]]:
+        """All recorded runs, oldest first, optionally for one dataset."""
+        if not self.manifest_path.exists():
+            return []
+        with open(self.manifest_path, 'r', encoding='utf-8') as f:
+            entries = [json.loads(line) for line in f if line.strip()]
+        return [e for e in entries if dataset is None or e['dataset'] == dataset]
+
+    def latest(self, dataset: str) -> Dict[str, Dict[str, Any]]:
+        """Newest file per source for a dataset (empty if nothing was stored)."""
+        path = self._latest_path(dataset)
+        if not path.exists():
+            return {}
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def latest_paths(self, dataset: str, sources: Optional[List[str]] = None) -> List[Path]:
+        """Paths of the newest file per source, i.e. the current view of a dataset."""
+        return [self.root / file['path'] for source, file in sorted(self.latest(dataset).items())
+                if sources is None or source in sources]
+
+    def iter_records(self, dataset: str, start_date: Optional[str] = None,
+                     end_date: Optional[str] = None,
+                     sources: Optional[List[str]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Stream stored records (JSON Lines or framed) across runs.
+
+        Args:
+            dataset: Dataset name
+            start_date: Inclusive ISO start date
+            end_date: Inclusive ISO end date
+            sources: Restrict to these sources
+
+        Yields:
+            Records in run order
+        """
+        for entry in self.manifest(dataset):
+            if entry['format'] not in RECORD_FORMATS:
+                continue
+            if (start_date and entry['date'] < start_date) or (end_date and entry['date'] > end_date):
+                continue
+            for file in entry['files']:
+                if sources is None or file['source'] in sources:
+                    yield from iter_records(self.root / file['path'])
+
+    def compact(self, retention_days: Optional[int] = None,
+                merge_after_days: int = 1) -> Dict[str, int]:
+        """
+        Drop expired runs and merge old record partitions.
+
+        Files referenced by LATEST are never removed or merged. The new
+        manifest is published before any file is deleted, so a crash part
+        way through leaves unreferenced files behind, never manifest
+        entries pointing at missing ones.
+
+        Args:
+            retention_days: Delete runs whose date is older than this many
+                days (None keeps everything)
+            merge_after_days: Merge the run files of a (dataset, source, date)
+                partition into one once the date is this many days old
+
+        Returns:
+            Counts of removed runs, merged files and bytes reclaimed
+        """
+        stats = {'runs_removed': 0, 'files_merged': 0, 'bytes_reclaimed': 0}
+        today = datetime.now(timezone.utc).date()
+        expire_before = (today - timedelta(days=retention_days)).isoformat() \
+            if retention_days is not None else None
+        merge_before = (today - timedelta(days=merge_after_days)).isoformat()
+
+        with self._locked():
+            entries = self.manifest()
+            pinned = {file['path'] for dataset in {e['dataset'] for e in entries}
+                      for file in self.latest(dataset).values()}
+
+            kept = []
+            obsolete = []
+            for entry in entries:
+                expired = expire_before is not None and entry['date'] < expire_before
+                if expired and not any(f['path'] in pinned for f in entry['files']):
+                    obsolete.extend(entry['files'])
+                    stats['runs_removed'] += 1
+                else:
+                    kept.append(entry)
+
+            partitions: Dict[tuple, List[tuple]] = {}
+            for entry in kept:
+                if entry['format'] not in RECORD_FORMATS or entry['date'] >= merge_before:
+                    continue
+                for file in entry['files']:
+                    if file['path'] not in pinned:
+                        key = (entry['dataset'], entry['format'], file['source'], entry['date'])
+                        partitions.setdefault(key, []).append((entry, file))
+
+            for (dataset, fmt, source, day), members in partitions.items():
+                if len(members) < 2:
+                    continue
+                kept.append(self._merge(dataset, fmt, source, day, members, stats))
+                for entry, file in members:
+                    obsolete.append(file)
+                    entry['files'].remove(file)
+                    entry['records'] -= file['records']
+                    entry['bytes'] -= file['bytes']
+
+            kept = [e for e in kept if e['files']]
+            kept.sort(key=lambda e: (e['date'], e['created_at']))
+            fd, tmp_path = tempfile.mkstemp(prefix=".manifest.", suffix='.tmp', dir=self.root)
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                for entry in kept:
+                    f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.manifest_path)
+
+            for file in obsolete:
+                self._remove(file, stats)
+
+        self.logger.info(f"Compacted output store: {stats}")
+        return stats
+
+    def _merge(self, dataset: str, fmt: str, source: str, day: str, members: List[tuple],
+               stats: Dict[str, int]) -> Dict[str, Any]:
+        """
+        Stream several run files of one partition into a single file.
+
+        The member files are left in place; compact deletes them once the
+        manifest no longer references them.
+        """
+        run = StoreRun(self, dataset, fmt, f"compacted-{uuid.uuid4().hex[:8]}", day)
+        writer = run.writer(source)
+        try:
+            for _, file in members:
+                writer.write_many(iter_records(self.root / file['path']))
+        except BaseException:
+            run.abort()
+            raise
+        writer.close()
+        stats['files_merged'] += len(members)
+        size = writer.path.stat().st_size
+        stats['bytes_reclaimed'] -= size
+        return {
+            'run_id': run.run_id,
+            'dataset': dataset,
+            'format': fmt,
+            'date': day,
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'records': writer.count,
+            'bytes': size,
+            'files': [{'source': source,
+                       'path': writer.path.relative_to(self.root).as_posix(),
+                       'records': writer.count, 'bytes': size}],
+            'compacted_from': [entry['run_id'] for entry, _ in members],
+        }
+
+    def _remove(self, file: Dict[str, Any], stats: Dict[str, int]):
+        path = self.root / file['path']
+        if path.exists():
+            stats['bytes_reclaimed'] += path.stat().st_size
+            path.unlink()
+        partition = path.parent
+        if partition.exists() and not any(partition.iterdir()):
+            shutil.rmtree(partition, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    # Example usage
+    store = OutputStore()
+    with store.begin_run('jobs') as run:
+        run.write({'job_id': '1', 'title': 'Software Engineer'}, source='GoogleCareersScraper')
+        run.write({'job_id': '2', 'title': 'Data Scientist'}, source='AmazonJobsScraper')
+    print("Latest:", store.latest_paths('jobs'))
+    print("Compaction:", store.compact(retention_days=90))
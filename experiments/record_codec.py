@@ -0,0 +1,332 @@
+"""
+Pluggable record codecs and length-prefixed framing.
+
+Records move between the scraping and analytics stages, and between
+worker processes, far more often than people read them, so the default
+serialization is tuned for speed rather than pretty-printing: JSON is
+encoded with orjson when it is installed, and msgpack is available as a
+compact binary option. Framed files hold one length-prefixed record per
+frame, so they can be streamed without delimiters or escaping.
+"""
+
+import gzip
+import io
+import json
+import os
+import struct
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, Optional, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+FRAME_HEADER = struct.Struct('>I')
+FRAMED_MAGIC = b'RECF1\n'
+
+
+def _default(obj: Any) -> Any:
+    """Fallback for values the encoders do not know, e.g. JobRecord."""
+    to_dict = getattr(obj, 'to_dict', None)
+    return to_dict() if to_dict is not None else str(obj)
+
+
+class JSONCodec:
+    """UTF-8 JSON, encoded with orjson when available."""
+
+    name = 'json'
+
+    def encode(self, record: Any) -> bytes:
+        if orjson is not None:
+            try:
+                return orjson.dumps(record, option=orjson.OPT_NON_STR_KEYS, default=_default)
+            except TypeError:
+                pass  # e.g. integers beyond 64 bits; the stdlib handles them
+        return json.dumps(record, ensure_ascii=False, default=_default).encode('utf-8')
+
+    def dumps(self, record: Any) -> str:
+        """Encode to a str, for text files such as JSON Lines."""
+        return self.encode(record).decode('utf-8')
+
+    def decode(self, data: Union[bytes, str]) -> Any:
+        return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+class MsgpackCodec:
+    """Compact binary encoding via msgpack."""
+
+    name = 'msgpack'
+
+    def __init__(self):
+        if msgpack is None:
+            raise ImportError("The msgpack codec needs 'pip install msgpack'")
+
+    def encode(self, record: Any) -> bytes:
+        return msgpack.packb(record, use_bin_type=True, default=_default)
+
+    def decode(self, data: bytes) -> Any:
+        return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+
+CODECS = {'json': JSONCodec, 'msgpack': MsgpackCodec}
+JSON_CODEC = JSONCodec()
+
+
+def get_codec(name: str = 'json'):
+    """
+    Codec instance by name.
+
+    Args:
+        name: 'json' or 'msgpack'
+
+    Returns:
+        Object with encode(record) -> bytes and decode(bytes) -> record
+    """
+    if name not in CODECS:
+        raise ValueError(f"Unknown codec: {name}")
+    return JSON_CODEC if name == 'json' else CODECS[name]()
+
+
+def default_binary_codec() -> str:
+    """msgpack when installed, otherwise JSON."""
+    return 'msgpack' if msgpack is not None else 'json'
+
+
+def _open_binary(path, mode: str, compress: Optional[str]):
+    if compress == 'gzip':
+        return gzip.open(path, mode + 'b')
+    if compress == 'zstd':
+        import zstandard
+        return zstandard.open(path, mode + 'b')
+    if compress is not None:
+        raise ValueError(f"Unsupported compression: {compress}")
+    return open(path, mode + 'b')
+
+
+def write_frame(stream: BinaryIO, payload: bytes):
+    """Write one length-prefixed frame."""
+    stream.write(FRAME_HEADER.pack(len(payload)))
+    stream.write(payload)
+
+
+def iter_frames(stream: BinaryIO) -> Iterator[bytes]:
+    """
+    Read length-prefixed frames until end of stream.
+
+    Raises:
+        ValueError: If the stream ends inside a frame
+    """
+    while True:
+        header = stream.read(FRAME_HEADER.size)
+        if not header:
+            return
+        if len(header) < FRAME_HEADER.size:
+            raise ValueError("Truncated frame header")
+        (size,) = FRAME_HEADER.unpack(header)
+        payload = stream.read(size)
+        if len(payload) < size:
+            raise ValueError("Truncated frame")
+        yield payload
+
+
+class FramedWriter:
+    """
+    Thread-safe, atomically published file of length-prefixed records.
+
+    The file starts with a magic line and a frame naming the codec, so
+    readers need no out-of-band configuration.
+    """
+
+    def __init__(self, path, compress: Optional[str] = None, codec: Optional[str] = None):
+        """
+        Initialize framed writer.
+
+        Args:
+            path: Final output path
+            compress: None, 'gzip' or 'zstd'
+            codec: 'json' or 'msgpack' (default: msgpack when installed)
+        """
+        self.path = Path(path)
+        self.compress = compress
+        self.codec = get_codec(codec or default_binary_codec())
+        self.count = 0
+        self._lock = threading.Lock()
+        self._file = None
+        self._tmp_path = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def open(self):
+        """Start writing to a temporary file next to the final path."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix=f".{self.path.name}.", suffix='.tmp',
+                                   dir=self.path.parent)
+        os.close(fd)
+        self._tmp_path = Path(tmp)
+        self._file = _open_binary(self._tmp_path, 'w', self.compress)
+        self._file.write(FRAMED_MAGIC)
+        write_frame(self._file, self.codec.name.encode('ascii'))
+
+    def write(self, record: Dict[str, Any]):
+        """Append one record."""
+        payload = self.codec.encode(record)
+        with self._lock:
+            if self._file is None:
+                raise ValueError(f"Writer for {self.path} is closed")
+            write_frame(self._file, payload)
+            self.count += 1
+
+    def write_many(self, records: Iterable[Dict[str, Any]]):
+        """Append records from any iterable without materializing it."""
+        for record in records:
+            self.write(record)
+
+    def close(self):
+        """Flush, fsync and atomically move the file into place."""
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.close()
+            self._file = None
+            fd = os.open(self._tmp_path, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+            os.replace(self._tmp_path, self.path)
+
+    def abort(self):
+        """Discard the temporary file, leaving any previous output intact."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            if self._tmp_path is not None and self._tmp_path.exists():
+                self._tmp_path.unlink()
+
+
+def _compression_of(path: Path) -> Optional[str]:
+    return {'.gz': 'gzip', '.zst': 'zstd'}.get(path.suffix)
+
+
+def iter_framed(path) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily read records from a framed file (compression detected by suffix).
+
+    Args:
+        path: File written by FramedWriter
+
+    Yields:
+        One record per frame
+    """
+    path = Path(path)
+    with _open_binary(path, 'r', _compression_of(path)) as f:
+        if f.read(len(FRAMED_MAGIC)) != FRAMED_MAGIC:
+            raise ValueError(f"{path} is not a framed record file")
+        frames = iter_frames(f)
+        codec = get_codec(next(frames).decode('ascii'))
+        for payload in frames:
+            yield codec.decode(payload)
+
+
+def iter_records(path) -> Iterator[Dict[str, Any]]:
+    """
+    Read any record file the exporters write: JSON Lines or framed.
+
+    Args:
+        path: .jsonl or .frames file, optionally .gz/.zst compressed
+
+    Yields:
+        Records in file order
+    """
+    from jsonl_writer import iter_jsonl
+
+    suffixes = Path(path).suffixes
+    if '.frames' in suffixes:
+        return iter_framed(path)
+    return iter_jsonl(path)
+
+
+def benchmark_codecs(records: list, repeat: int = 3) -> Dict[str, Dict[str, float]]:
+    """
+    Serialization throughput against today's json.dump(indent=2) export.
+
+    Args:
+        records: Sample job records
+        repeat: Rounds per variant (best round is reported)
+
+    Returns:
+        Per variant: encode/decode records per second and bytes per record
+    """
+    def best(func):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = func()
+            timings.append(time.perf_counter() - start)
+        return min(timings), result
+
+    def pretty_encode():
+        buffer = io.StringIO()
+        json.dump(records, buffer, indent=2)
+        return buffer.getvalue().encode('utf-8')
+
+    variants = {'json_indent2': (pretty_encode, lambda data: json.loads(data))}
+
+    def framed(codec):
+        def encode():
+            buffer = io.BytesIO()
+            for record in records:
+                write_frame(buffer, codec.encode(record))
+            return buffer.getvalue()
+
+        def decode(data):
+            return [codec.decode(payload) for payload in iter_frames(io.BytesIO(data))]
+        return encode, decode
+
+    variants['json_frames' + ('_orjson' if orjson is not None else '')] = framed(JSON_CODEC)
+    if msgpack is not None:
+        variants['msgpack_frames'] = framed(MsgpackCodec())
+
+    results = {}
+    count = max(1, len(records))
+    for name, (encode, decode) in variants.items():
+        encode_seconds, data = best(encode)
+        decode_seconds, _ = best(lambda: decode(data))
+        results[name] = {
+            'encode_records_per_sec': count / encode_seconds if encode_seconds else 0.0,
+            'decode_records_per_sec': count / decode_seconds if decode_seconds else 0.0,
+            'bytes_per_record': len(data) / count,
+        }
+    return results
+
+
+if __name__ == "__main__":
+    # Example usage
+    sample = [
+        {'job_id': str(i), 'title': 'Software Engineer', 'company': 'Example Corp',
+         'location': 'Seattle, WA', 'skills': ['python', 'sql', 'aws'],
+         'description': 'Build data pipelines. ' * 20}
+        for i in range(20000)
+    ]
+    for variant, stats in benchmark_codecs(sample).items():
+        print(f"{variant:20s} encode {stats['encode_records_per_sec']:>10.0f}/s  "
+              f"decode {stats['decode_records_per_sec']:>10.0f}/s  "
+              f"{stats['bytes_per_record']:7.1f} B/record")
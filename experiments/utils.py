@@ -1,10 +1,13 @@
 # Utility functions for web data extraction
 
+import asyncio
+import functools
+import threading
 import time
 import logging
-from typing import Optional
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
@@ -28,46 +31,155 @@ def retry_request(func, max_retries: int = 3, backoff_factor: float = 2.0):
             time.sleep(wait_time)
 
 
-def rate_limit(requests_per_second: float = 1.0):
+class TokenBucket:
     """
-    Rate limit decorator.
+    Thread-safe token bucket with sync and async acquire.
+
+    Each acquire reserves the next available token under a short lock and then
+    waits outside it, so concurrent callers are served in arrival order and a
+    waiting coroutine never blocks the event loop.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        Initialize token bucket.
+
+        Args:
+            rate: Tokens added per second
+            burst: Maximum number of tokens that can accumulate
+        """
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self, tokens: float = 1.0) -> float:
+        """Take tokens (possibly going into debt) and return the wait time."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def acquire(self, tokens: float = 1.0):
+        """Block the calling thread until tokens are available."""
+        wait_time = self._reserve(tokens)
+        if wait_time > 0:
+            time.sleep(wait_time)
+
+    async def acquire_async(self, tokens: float = 1.0):
+        """Wait without blocking the event loop until tokens are available."""
+        wait_time = self._reserve(tokens)
+        if wait_time > 0:
+            await asyncio.sleep(wait_time)
+
+
+class HostRateLimiter:
+    """Per-host token buckets so each site runs at its own allowed rate."""
+
+    def __init__(self, default_rate: float = 1.0, default_burst: int = 1,
+                 host_limits: Optional[Dict[str, Tuple[float, int]]] = None):
+        """
+        Initialize per-host rate limiter.
+
+        Args:
+            default_rate: Requests per second for hosts without an explicit limit
+            default_burst: Burst capacity for hosts without an explicit limit
+            host_limits: Mapping of host to (requests_per_second, burst)
+        """
+        self.default_rate = default_rate
+        self.default_burst = default_burst
+        self.host_limits = dict(host_limits or {})
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def set_limit(self, host: str, rate: float, burst: int = 1):
+        """Set or replace the limit for one host."""
+        with self._lock:
+            self.host_limits[host] = (rate, burst)
+            self._buckets.pop(host, None)
+
+    def bucket(self, url_or_host: str) -> TokenBucket:
+        """Return the bucket for a URL or bare host, creating it on first use."""
+        host = urlsplit(url_or_host).hostname if '://' in url_or_host else url_or_host
+        host = (host or '').lower()
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                rate, burst = self.host_limits.get(host, (self.default_rate, self.default_burst))
+                bucket = self._buckets[host] = TokenBucket(rate, burst)
+            return bucket
+
+    def acquire(self, url_or_host: str):
+        """Block until a request to this host is allowed."""
+        self.bucket(url_or_host).acquire()
+
+    async def acquire_async(self, url_or_host: str):
+        """Wait asynchronously until a request to this host is allowed."""
+        await self.bucket(url_or_host).acquire_async()
+
+
+def _default_rate_key(func, args, kwargs) -> str:
+    """Use the URL argument's host as the rate key, falling back to the function name."""
+    url = kwargs.get('url')
+    if url is None and args:
+        url = next((a for a in args if isinstance(a, str) and '://' in a), None)
+    if isinstance(url, str) and '://' in url:
+        return urlsplit(url).hostname or func.__qualname__
+    return func.__qualname__
+
+
+def rate_limit(requests_per_second: float = 1.0, burst: int = 1,
+               limiter: Optional[HostRateLimiter] = None, key_func=None):
+    """
+    Rate limit decorator backed by per-host token buckets.
+    
+    Works on both regular and ``async`` functions. Calls are keyed by the host
+    of their URL argument, so a slow site does not throttle the others.
     
     Args:
-        requests_per_second: Number of requests allowed per second
+        requests_per_second: Number of requests allowed per second per host
+        burst: Number of requests allowed back-to-back before throttling
+        limiter: Optional shared limiter (e.g. with per-host overrides)
+        key_func: Optional callable (func, args, kwargs) -> key
     """
     def decorator(func):
-        last_called = [0.0]
+        shared = limiter or HostRateLimiter(requests_per_second, burst)
+        get_key = key_func or _default_rate_key
+        
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                await shared.acquire_async(get_key(func, args, kwargs))
+                return await func(*args, **kwargs)
+            return async_wrapper
         
+        @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            elapsed = time.time() - last_called[0]
-            wait_time = (1.0 / requests_per_second) - elapsed
-            
-            if wait_time > 0:
-                time.sleep(wait_time)
-            
-            last_called[0] = time.time()
+            shared.acquire(get_key(func, args, kwargs))
             return func(*args, **kwargs)
         
         return wrapper
     return decorator
 
 
-def extract_data(html: str, selector: str, attribute: Optional[str] = None) -> list:
+def extract_data(html, selector: str, attribute: Optional[str] = None) -> list:
     """
     Extract data from HTML using CSS selector.
     
     Args:
-        html: HTML content
+        html: HTML content or an already parsed BeautifulSoup document
         selector: CSS selector
         attribute: Optional attribute to extract
     
     Returns:
         List of extracted data
     """
-    from bs4 import BeautifulSoup
+    from dom_parsing_example import extract_elements
     
-    soup = BeautifulSoup(html, 'html.parser')
-    elements = soup.select(selector)
+    elements = extract_elements(html, selector)
     
     if attribute:
         return [elem.get(attribute) for elem in elements]
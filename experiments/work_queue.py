@@ -0,0 +1,318 @@
+"""
+Shared work queue for sharded multi-worker crawls.
+
+Tasks live in a SQLite database in WAL mode, so several worker processes
+on one machine (or nodes sharing the file) can lease tasks, retry tasks
+whose lease expired, and write results to a common sink table.
+"""
+
+import json
+import logging
+import multiprocessing
+import os
+import socket
+import sqlite3
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from record_codec import get_codec
+
+logger = logging.getLogger(__name__)
+
+
+class SQLiteWorkQueue:
+    """Lease-based task queue with a shared result sink."""
+
+    def __init__(self, path: Optional[str] = None, lease_seconds: float = 300.0,
+                 max_attempts: int = 3, codec: str = 'json'):
+        """
+        Initialize work queue.
+
+        Args:
+            path: SQLite database file (default: output/work_queue.sqlite)
+            lease_seconds: How long a leased task is owned before another
+                worker may take it over
+            max_attempts: Leases per task before it is marked failed
+            codec: Encoding of result records, 'json' or 'msgpack'; every
+                worker and reader of one queue must use the same codec
+        """
+        if path is None:
+            output_dir = Path(__file__).parent.parent / "output"
+            output_dir.mkdir(exist_ok=True)
+            path = output_dir / "work_queue.sqlite"
+
+        self.path = str(path)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.codec = get_codec(codec)
+        self._conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS tasks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                dedupe_key TEXT UNIQUE,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                available_at REAL NOT NULL,
+                lease_expires REAL,
+                worker TEXT,
+                error TEXT
+            );
+            CREATE INDEX IF NOT EXISTS tasks_ready ON tasks (status, available_at);
+            CREATE TABLE IF NOT EXISTS results (
+                task_id INTEGER NOT NULL,
+                record TEXT NOT NULL
+            );
+        """)
+
+    def close(self):
+        self._conn.close()
+
+    def put(self, kind: str, payload: Dict[str, Any], dedupe_key: Optional[str] = None) -> bool:
+        """
+        Enqueue a task.
+
+        Args:
+            kind: Handler name
+            payload: JSON-serializable task arguments
+            dedupe_key: Optional key; a task with the same key is enqueued once
+
+        Returns:
+            True if the task was added
+        """
+        cursor = self._conn.execute(
+            "INSERT OR IGNORE INTO tasks (kind, payload, dedupe_key, available_at) "
+            "VALUES (?, ?, ?, ?)",
+            (kind, json.dumps(payload), dedupe_key, time.time())
+        )
+        return cursor.rowcount == 1
+
+    def lease(self, worker: str, limit: int = 1) -> List[Tuple[int, str, Dict[str, Any]]]:
+        """
+        Lease up to ``limit`` ready tasks, including tasks whose lease expired.
+
+        Returns:
+            List of (task_id, kind, payload)
+        """
+        now = time.time()
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Expired leases go back to the pool, or fail once out of attempts
+            self._conn.execute(
+                "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                "error = COALESCE(error, 'lease expired'), worker = NULL "
+                "WHERE status = 'leased' AND lease_expires < ?",
+                (self.max_attempts, now)
+            )
+            rows = self._conn.execute(
+                "SELECT id, kind, payload FROM tasks WHERE status = 'pending' AND available_at <= ? "
+                "ORDER BY id LIMIT ?", (now, limit)
+            ).fetchall()
+            if rows:
+                self._conn.executemany(
+                    "UPDATE tasks SET status = 'leased', worker = ?, lease_expires = ?, "
+                    "attempts = attempts + 1 WHERE id = ?",
+                    [(worker, now + self.lease_seconds, row[0]) for row in rows]
+                )
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        return [(task_id, kind, json.loads(payload)) for task_id, kind, payload in rows]
+
+    def complete(self, task_id: int, worker: str, records: List[Dict[str, Any]] = (),
+                 follow_ups: List[Tuple[str, Dict[str, Any], Optional[str]]] = ()) -> bool:
+        """
+        Store results and follow-up tasks and mark the task done, atomically.
+
+        Completion is ignored if the lease was lost to another worker, so a
+        slow worker cannot write duplicate results.
+
+        Returns:
+            True if the task was completed by this worker
+        """
+        now = time.time()
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            cursor = self._conn.execute(
+                "UPDATE tasks SET status = 'done', lease_expires = NULL "
+                "WHERE id = ? AND worker = ? AND status = 'leased'", (task_id, worker)
+            )
+            if cursor.rowcount != 1:
+                self._conn.execute("ROLLBACK")
+                return False
+            self._conn.executemany(
+                "INSERT INTO results (task_id, record) VALUES (?, ?)",
+                [(task_id, self.codec.encode(record)) for record in records]
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO tasks (kind, payload, dedupe_key, available_at) "
+                "VALUES (?, ?, ?, ?)",
+                [(kind, json.dumps(payload), key, now) for kind, payload, key in follow_ups]
+            )
+            self._conn.execute("COMMIT")
+            return True
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def fail(self, task_id: int, worker: str, error: str, retry_delay: float = 1.0):
+        """Release a task for retry with a delay, or mark it failed once out of attempts."""
+        self._conn.execute(
+            "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+            "available_at = ?, error = ?, worker = NULL, lease_expires = NULL "
+            "WHERE id = ? AND worker = ?",
+            (self.max_attempts, time.time() + retry_delay, error, task_id, worker)
+        )
+
+    def counts(self) -> Dict[str, int]:
+        """Number of tasks per status."""
+        rows = self._conn.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status").fetchall()
+        return dict(rows)
+
+    def is_drained(self) -> bool:
+        """True when no task is pending or leased."""
+        counts = self.counts()
+        return not counts.get('pending') and not counts.get('leased')
+
+    def iter_results(self, batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """Stream every result record in insertion order."""
+        last = 0
+        while True:
+            rows = self._conn.execute(
+                "SELECT rowid, record FROM results WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                (last, batch_size)
+            ).fetchall()
+            if not rows:
+                return
+            for rowid, record in rows:
+                # Text rows predate binary codecs and are always JSON
+                yield json.loads(record) if isinstance(record, str) else self.codec.decode(record)
+            last = rows[-1][0]
+
+
+# Handler signature: payload -> (records, follow-up tasks as (kind, payload, dedupe_key))
+Handler = Callable[[Dict[str, Any]], Tuple[List[Dict[str, Any]], List[Tuple[str, Dict[str, Any], Optional[str]]]]]
+
+
+def run_worker(path: str, handlers: Dict[str, Handler], batch: int = 1,
+               idle_timeout: float = 10.0, worker: Optional[str] = None,
+               codec: str = 'json') -> int:
+    """
+    Lease and process tasks until the queue stays empty for ``idle_timeout``.
+
+    Args:
+        path: Queue database file
+        handlers: Mapping of task kind to handler
+        batch: Tasks leased per round trip
+        idle_timeout: Seconds without work before the worker exits
+        worker: Worker id (default: host pid plus random suffix)
+        codec: Result record codec (see SQLiteWorkQueue)
+
+    Returns:
+        Number of tasks completed
+    """
+    worker = worker or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+    work_queue = SQLiteWorkQueue(path, codec=codec)
+    completed = 0
+    idle_since = time.monotonic()
+
+    try:
+        while True:
+            tasks = work_queue.lease(worker, batch)
+            if not tasks:
+                if work_queue.is_drained() or time.monotonic() - idle_since > idle_timeout:
+                    return completed
+                time.sleep(0.2)
+                continue
+
+            idle_since = time.monotonic()
+            for task_id, kind, payload in tasks:
+                try:
+                    records, follow_ups = handlers[kind](payload)
+                except Exception as e:
+                    logger.error(f"Task {task_id} ({kind}) failed: {str(e)}")
+                    work_queue.fail(task_id, worker, str(e))
+                    continue
+                if work_queue.complete(task_id, worker, records, follow_ups):
+                    completed += 1
+    finally:
+        work_queue.close()
+
+
+def run_workers(path: str, handlers_factory: Callable[[int], Dict[str, Handler]],
+                processes: int = 4, **kwargs) -> int:
+    """
+    Run several worker processes against one queue and wait for them.
+
+    Args:
+        path: Queue database file
+        handlers_factory: Picklable callable building handlers in each
+            worker, given the worker count (e.g. to split per-host rate
+            limits evenly across processes)
+        processes: Number of worker processes
+        **kwargs: Passed to run_worker
+
+    Returns:
+        Total tasks completed
+    """
+    with multiprocessing.Pool(processes) as pool:
+        results = [pool.apply_async(_worker_entry, (path, handlers_factory, processes, kwargs))
+                   for _ in range(processes)]
+        return sum(result.get() for result in results)
+
+
+def _worker_entry(path, handlers_factory, processes, kwargs):
+    return run_worker(path, handlers_factory(processes), **kwargs)
+
+
+class ListingHandlers:
+    """
+    Picklable handler factory for listing-page tasks.
+
+    A ``listing`` task payload holds ``url``, ``source``, ``item_selector``
+    and ``fields`` (an ExtractionPlan mapping), plus optional
+    ``next_selector`` and ``max_pages`` for pagination. Each worker gets
+    its share of the per-host rate, so the fleet as a whole stays within it.
+    """
+
+    def __init__(self, rate_per_host: float = 1.0, burst: int = 1):
+        self.rate_per_host = rate_per_host
+        self.burst = burst
+
+    def __call__(self, processes: int) -> Dict[str, Handler]:
+        from urllib.parse import urljoin
+
+        from dom_parsing_example import ExtractionPlan, extract_attributes, parse_html
+        from http_request_with_retry import RetryableHTTPClient
+        from utils import HostRateLimiter
+
+        limiter = HostRateLimiter(self.rate_per_host / max(1, processes), self.burst)
+        client = RetryableHTTPClient(rate_limiter=limiter)
+
+        def listing(payload):
+            response = client.get(payload['url'])
+            if response is None:
+                raise RuntimeError(f"fetch failed: {payload['url']}")
+
+            plan = ExtractionPlan(payload['item_selector'], {
+                name: tuple(spec) if isinstance(spec, list) else spec
+                for name, spec in payload['fields'].items()
+            })
+            soup = parse_html(response.text, plan.parser)
+            records = [dict(record, source=payload.get('source')) for record in plan.extract(soup)]
+
+            follow_ups = []
+            page = payload.get('page', 1)
+            if payload.get('next_selector') and page < payload.get('max_pages', 1):
+                for href in extract_attributes(soup, payload['next_selector'], 'href')[:1]:
+                    next_url = urljoin(payload['url'], href)
+                    follow_ups.append(('listing', dict(payload, url=next_url, page=page + 1), next_url))
+            return records, follow_ups
+
+        return {'listing': listing}
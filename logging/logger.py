@@ -2,42 +2,118 @@
 Centralized logging configuration for the job market scraper.
 
 Provides consistent logging across all modules with file and console output.
+Records from every logger are handed to a queue on the root logger and
+written by one background listener per process, so scraping threads never
+block on log I/O.
 """
 
+import atexit
+import json
 import logging
 import logging.handlers
+import queue
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
 
+LOG_DIR = Path(__file__).parent.parent / "logs"
 
-def setup_logger(name, log_level=logging.INFO):
+_lock = threading.Lock()
+_queue = None
+_queue_handler = None
+_listener = None
+_json_handler = None
+_registered_atexit = False
+
+
+class JSONLinesFormatter(logging.Formatter):
+    """Formats records as one JSON object per line."""
+
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record, '%Y-%m-%dT%H:%M:%S'),
+            'logger': record.name,
+            'level': record.levelname,
+            'message': record.getMessage(),
+        }
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        extra = getattr(record, 'fields', None)
+        if isinstance(extra, dict):
+            entry.update(extra)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class RateLimitFilter(logging.Filter):
     """
-    Configure and return a logger instance.
+    Caps how often the same logging call is emitted.
 
-    Args:
-        name: Logger name (typically __name__)
-        log_level: Logging level (default: INFO)
+    Records at or below ``max_level`` are grouped by their call site (logger,
+    file and line), so an f-string message such as f"Fetched {url}" logged
+    for thousands of URLs counts as one stream. Dropped records are
+    summarized when the stream is next allowed through. Only the
+    ``max_sites`` most recently used call sites are tracked.
+    """
 
-    Returns:
-        logging.Logger: Configured logger instance
+    def __init__(self, per_second: float = 5.0, burst: int = 20, max_level: int = logging.INFO,
+                 max_sites: int = 1024):
+        """
+        Initialize rate limit filter.
+
+        Args:
+            per_second: Sustained records per second per call site
+            burst: Records allowed back-to-back
+            max_level: Records above this level are never dropped
+            max_sites: Call sites tracked before the least recently used
+                one is forgotten
+        """
+        super().__init__()
+        self.per_second = per_second
+        self.burst = burst
+        self.max_level = max_level
+        self.max_sites = max_sites
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno > self.max_level:
+            return True
+        key = (record.name, record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated, dropped = self._buckets.pop(key, (self.burst, now, 0))
+            tokens = min(self.burst, tokens + (now - updated) * self.per_second)
+            if tokens < 1:
+                self._buckets[key] = (tokens, now, dropped + 1)
+            else:
+                self._buckets[key] = (tokens - 1, now, 0)
+            if len(self._buckets) > self.max_sites:
+                self._buckets.popitem(last=False)
+        if tokens < 1:
+            return False
+        if dropped:
+            record.msg = f"{record.msg} [{dropped} similar messages suppressed]"
+        return True
+
+
+def _build_handlers():
     """
-    logger = logging.getLogger(name)
-    logger.setLevel(log_level)
+    Create the shared file and console handlers for this process.
 
-    # Create logs directory if it doesn't exist
-    log_dir = Path(__file__).parent.parent / "logs"
-    log_dir.mkdir(exist_ok=True)
+    Levels are left to each logger, since the handlers are shared.
+    """
+    LOG_DIR.mkdir(exist_ok=True)
 
     # File handler
     file_handler = logging.handlers.RotatingFileHandler(
-        log_dir / "scraper.log",
+        LOG_DIR / "scraper.log",
         maxBytes=10485760,  # 10MB
         backupCount=5
     )
-    file_handler.setLevel(log_level)
 
     # Console handler
     console_handler = logging.StreamHandler()
-    console_handler.setLevel(log_level)
 
     # Formatter
     formatter = logging.Formatter(
@@ -45,12 +121,125 @@ def setup_logger(name, log_level=logging.INFO):
         datefmt='%Y-%m-%d %H:%M:%S'
     )
 
-    file_handler.setFormatter(formatter)
-    console_handler.setFormatter(formatter)
+    handlers = [file_handler, console_handler]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    return handlers
+
+
+def _ensure_listener(json_lines, log_level):
+    """
+    Start the process-wide queue listener on first use.
+
+    The queue handler is installed once on the root logger, so every module
+    logger (``logging.getLogger(__name__)``) goes through the queue, not
+    only loggers created by setup_logger.
+    """
+    global _queue, _queue_handler, _listener, _json_handler, _registered_atexit
+
+    with _lock:
+        root = logging.getLogger()
+        if _listener is None:
+            _queue = queue.SimpleQueue()
+            handlers = _build_handlers()
+            _listener = logging.handlers.QueueListener(
+                _queue, *handlers, respect_handler_level=True
+            )
+            _listener.start()
+            _queue_handler = logging.handlers.QueueHandler(_queue)
+            root.addHandler(_queue_handler)
+            if not _registered_atexit:
+                atexit.register(shutdown_logging)
+                _registered_atexit = True
+
+        if root.level > log_level:
+            root.setLevel(log_level)
 
-    # Add handlers to logger
-    if not logger.handlers:
-        logger.addHandler(file_handler)
-        logger.addHandler(console_handler)
+        if json_lines and _json_handler is None:
+            _json_handler = logging.handlers.RotatingFileHandler(
+                LOG_DIR / "scraper.jsonl",
+                maxBytes=10485760,  # 10MB
+                backupCount=5
+            )
+            _json_handler.setFormatter(JSONLinesFormatter())
+            # The listener reads its handler tuple on every record
+            _listener.handlers = _listener.handlers + (_json_handler,)
+
+
+def shutdown_logging():
+    """
+    Flush queued records and stop the background listener.
+
+    Logging can be set up again afterwards; a fresh queue, root handler and
+    (when requested) JSON Lines handler are created.
+    """
+    global _queue, _queue_handler, _listener, _json_handler
+    with _lock:
+        if _queue_handler is not None:
+            logging.getLogger().removeHandler(_queue_handler)
+            _queue_handler = None
+        if _listener is not None:
+            _listener.stop()
+            for handler in _listener.handlers:
+                handler.close()
+            _listener = None
+        _queue = None
+        _json_handler = None
+
+
+def setup_logger(name, log_level=logging.INFO, json_lines=False, max_per_second=None):
+    """
+    Configure and return a logger instance.
+
+    Calling this repeatedly for the same name is cheap and does not open new
+    files: all loggers share one set of handlers behind a queue on the root
+    logger. Repeat calls update the level and rate limit.
+
+    Args:
+        name: Logger name (typically __name__)
+        log_level: Logging level (default: INFO)
+        json_lines: Also write structured records to logs/scraper.jsonl
+        max_per_second: Optional cap on INFO/DEBUG records per second from
+            any one logging call, for noisy per-request logging (None keeps
+            the current cap, 0 removes it)
+
+    Returns:
+        logging.Logger: Configured logger instance
+    """
+    logger = logging.getLogger(name)
+    logger.setLevel(log_level)
+
+    _ensure_listener(json_lines, log_level)
+
+    if max_per_second is not None:
+        for existing in [f for f in logger.filters if isinstance(f, RateLimitFilter)]:
+            logger.removeFilter(existing)
+        if max_per_second:
+            logger.addFilter(RateLimitFilter(per_second=max_per_second,
+                                             burst=max(1, int(max_per_second * 4))))
 
     return logger
+
+
+if __name__ == "__main__":
+    # Example usage: per-URL messages from one call are limited as one stream
+    class _Collect(logging.Handler):
+        def __init__(self):
+            super().__init__()
+            self.records = []
+
+        def emit(self, record):
+            self.records.append(record)
+
+    demo = logging.getLogger('rate_limit_demo')
+    demo.setLevel(logging.INFO)
+    demo.propagate = False
+    collected = _Collect()
+    demo.addHandler(collected)
+    limiter = RateLimitFilter(per_second=1, burst=3)
+    demo.addFilter(limiter)
+    for i in range(100):
+        demo.info(f"Fetched https://example.com/jobs/{i}")
+    assert len(collected.records) == 3
+    assert len(limiter._buckets) == 1
+    print(f"{len(collected.records)} of 100 messages passed")
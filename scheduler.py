@@ -4,53 +4,369 @@ Main scheduler and orchestrator for job market intelligence scraper.
 Coordinates the scraping of multiple job sources and aggregates results.
 """
 
+import argparse
 import logging
+import random
+import signal
+import threading
+import time
 from datetime import datetime
+from pathlib import Path
 from logging.logger import setup_logger
 
+try:
+    import fcntl
+except ImportError:  # Cross-process overlap protection is POSIX-only
+    fcntl = None
+
 # Configure logging
 logger = setup_logger(__name__)
 
+# Default per-source cadences for daemon mode, in seconds
+DEFAULT_INTERVALS = {
+    'AmazonJobsScraper': 3600,
+    'GoogleCareersScraper': 86400,
+    'MicrosoftCareersScraper': 86400,
+}
+
+# Seconds before sources are retried when their run was skipped because
+# another run held the lock
+BUSY_RETRY_SECONDS = 60
+
 
 class JobMarketScheduler:
     """Orchestrates job scraping and analysis tasks."""
 
-    def __init__(self):
-        """Initialize the scheduler."""
+    def __init__(self, incremental: bool = False, scrapers=None, output_dir=None,
+                 keep_history: bool = False, partitioned: bool = True,
+                 retention_days=None, record_format: str = 'jsonl', dedup: bool = False):
+        """
+        Initialize the scheduler.
+
+        Args:
+            incremental: Export only new, changed and removed jobs and update
+                persisted skill counters from them
+            scrapers: Optional source scrapers (default: all built-in sources)
+            output_dir: Optional output directory (default: output/)
+            keep_history: Append each full scrape to the columnar job
+                history (not available in incremental mode)
+            partitioned: Keep every run in the date-partitioned OutputStore
+                (output/store) instead of overwriting jobs and skill_trends files
+            retention_days: Compact the store after each run, dropping runs
+                older than this many days (None keeps everything)
+            record_format: Export format handed from scraping to analytics:
+                'jsonl' or 'frames' (length-prefixed msgpack/JSON records)
+            dedup: Merge near-duplicate postings (MinHash/LSH) into one
+                canonical record before export, so skill counts are not
+                inflated by reposts (not available in incremental mode)
+        """
         self.logger = logger
+        self.incremental = incremental
+        self.scrapers = scrapers
+        self.output_dir = output_dir
+        self.keep_history = keep_history
+        self.partitioned = partitioned
+        self.retention_days = retention_days
+        self.record_format = record_format
+        self.dedup = dedup
+        self.store = None
+        self.skill_extractor = None
+        self.metrics = None
         self.scraped_jobs = []
+        self.source_stats = []
+        self.export_path = None
+        self.export_paths = []
+        self.published = False
+        self.aggregator = None
+        self._run_lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def _get_aggregator(self):
+        """
+        Build the aggregated scraper once and keep it for later cycles.
 
-    def run_all_scrapers(self):
-        """Execute all job market scrapers."""
+        Scrapers, their HTTP sessions and the fingerprint store stay warm
+        between runs in daemon mode.
+        """
+        if self.aggregator is None:
+            # Import scrapers dynamically
+            from experiments.aggregate_scraper import AggregatedScraper
+            fingerprints = None
+            if self.incremental:
+                from experiments.fingerprint_store import FingerprintStore
+                path = Path(self.output_dir) / "fingerprints.sqlite" if self.output_dir else None
+                fingerprints = FingerprintStore(path)
+            if self.partitioned:
+                from experiments.output_store import OutputStore
+                self.store = OutputStore(Path(self.output_dir) / "store" if self.output_dir else None)
+            dedup = None
+            if self.dedup and not self.incremental:
+                from experiments.near_duplicates import NearDuplicateIndex
+                dedup = NearDuplicateIndex()
+            self.aggregator = AggregatedScraper(fingerprints=fingerprints, scrapers=self.scrapers,
+                                                output_dir=self.output_dir, store=self.store,
+                                                record_format=self.record_format, dedup=dedup)
+            self.metrics = self.aggregator.metrics
+        return self.aggregator
+
+    def run_all_scrapers(self, sources=None):
+        """
+        Execute all job market scrapers.
+
+        Args:
+            sources: Optional scraper class names to run (default: all)
+        """
         self.logger.info("Starting job market scraping cycle")
-        # Import scrapers dynamically
+        self.export_path = None
+        self.export_paths = []
+        self.source_stats = []
+        self.published = False
         try:
-            from experiments.aggregate_scraper import AggregatedScraper
-            scraper = AggregatedScraper()
-            self.scraped_jobs = scraper.scrape_all()
-            self.logger.info(f"Successfully scraped {len(self.scraped_jobs)} jobs")
+            scraper = self._get_aggregator()
+            # Jobs are streamed to disk; analytics reads them back lazily
+            scraper.scrape_all(collect=False, sources=sources)
+            self.export_path = scraper.export_path
+            self.export_paths = scraper.export_paths
+            self.published = scraper.published
+            self.source_stats = scraper.source_stats
+            for stats in self.source_stats:
+                self.logger.info(
+                    f"{stats['source']}: {stats['status']}, {stats['jobs']} jobs "
+                    f"in {stats['elapsed']:.2f}s"
+                )
+            total = sum(stats['jobs'] for stats in self.source_stats)
+            self.logger.info(f"Successfully scraped {total} jobs")
         except Exception as e:
             self.logger.error(f"Error during scraping: {str(e)}")
 
+    def record_history(self):
+        """Append the latest export to the columnar job history."""
+        if not self.keep_history or self.incremental or not self.export_paths:
+            return
+        try:
+            from analytics.job_history import JobHistoryStore
+            from experiments.record_codec import iter_records
+            root = Path(self.output_dir) / "history" if self.output_dir else None
+            JobHistoryStore(root).append(job for path in self.export_paths
+                                         for job in iter_records(path))
+        except Exception as e:
+            self.logger.error(f"Error recording job history: {str(e)}")
+
     def run_analytics(self):
         """Run analytics on collected data."""
+        if self.incremental and not self.export_paths:
+            if self.published:
+                # A quiet cycle: the export held no change events
+                self.logger.info("No job changes this cycle, skipping incremental analytics")
+            else:
+                # Applying older change events again would double-count them
+                # in the skill counters
+                self.logger.warning("No export published this cycle, skipping incremental analytics")
+            return
         self.logger.info("Running analytics on job data")
         try:
             from analytics.skill_trends import SkillAnalyzer
-            analyzer = SkillAnalyzer(self.scraped_jobs)
-            analyzer.analyze()
+            from analytics.skill_extractor import SkillExtractor
+            if self.skill_extractor is None:
+                self.skill_extractor = SkillExtractor()
+            if self.store is not None and not self.incremental:
+                # Newest partition of every source, not just the ones run this cycle
+                analyzer = SkillAnalyzer.from_jsonl(self.store.latest_paths('jobs'), self.output_dir,
+                                                    extractor=self.skill_extractor,
+                                                    store=self.store)
+            elif self.export_paths:
+                analyzer = SkillAnalyzer.from_jsonl(self.export_paths, self.output_dir,
+                                                    extractor=self.skill_extractor,
+                                                    store=self.store)
+            else:
+                analyzer = SkillAnalyzer(self.scraped_jobs, self.output_dir,
+                                         extractor=self.skill_extractor, store=self.store)
+            # The metrics module the aggregator registered its histograms in
+            from metrics import time_stage
+            with time_stage('analyze'):
+                if self.incremental:
+                    analyzer.analyze_incremental()
+                else:
+                    analyzer.analyze()
             self.logger.info("Analytics completed successfully")
         except Exception as e:
             self.logger.error(f"Error during analytics: {str(e)}")
 
-    def execute(self):
-        """Execute the full scraping and analysis pipeline."""
-        self.logger.info(f"Pipeline execution started at {datetime.now()}")
-        self.run_all_scrapers()
-        self.run_analytics()
-        self.logger.info(f"Pipeline execution completed at {datetime.now()}")
+    def execute(self, sources=None) -> bool:
+        """
+        Execute the full scraping and analysis pipeline.
+
+        Runs are never overlapped: if another run holds the scheduler lock,
+        in this process or another, the call is skipped.
+
+        Args:
+            sources: Optional scraper class names to run (default: all)
+
+        Returns:
+            True if the pipeline ran, False if it was skipped
+        """
+        if not self._run_lock.acquire(blocking=False):
+            self.logger.warning("Previous run still in progress, skipping")
+            return False
+        lock_file = self._acquire_process_lock()
+        if lock_file is False:
+            self._run_lock.release()
+            self.logger.warning("Another scheduler process is running, skipping")
+            return False
+
+        try:
+            self.logger.info(f"Pipeline execution started at {datetime.now()}")
+            self.run_all_scrapers(sources)
+            self.record_history()
+            self.run_analytics()
+            self.compact_store()
+            self.write_metrics()
+            self.logger.info(f"Pipeline execution completed at {datetime.now()}")
+            return True
+        finally:
+            if lock_file:
+                lock_file.close()
+            self._run_lock.release()
+
+    def compact_store(self):
+        """Apply the retention policy to the output store."""
+        if self.store is None or self.retention_days is None:
+            return
+        try:
+            self.store.compact(retention_days=self.retention_days)
+        except Exception as e:
+            self.logger.error(f"Error compacting output store: {str(e)}")
+
+    def _acquire_process_lock(self):
+        """
+        Take an exclusive, non-blocking lock on output/scheduler.lock.
+
+        Returns:
+            Open lock file, None when locking is unsupported, or False if
+            another process holds the lock
+        """
+        if fcntl is None:
+            return None
+        output_dir = Path(self.output_dir) if self.output_dir else Path(__file__).parent / "output"
+        output_dir.mkdir(exist_ok=True)
+        lock_file = open(output_dir / "scheduler.lock", 'w')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        return lock_file
+
+    def run_forever(self, intervals=None, default_interval: float = 86400,
+                    jitter: float = 0.1, metrics_port=None):
+        """
+        Run as a resident daemon with a cadence per source.
+
+        Daemon mode is always incremental, so sources that run on different
+        schedules each update their own fingerprints and the shared skill
+        counters. Options that need full exports, ``keep_history`` and
+        ``dedup``, are therefore disabled (with a warning) for the daemon.
+        Expensive resources (scrapers and their connection pools,
+        the fingerprint store, the skill taxonomy) stay warm between cycles.
+        Sources whose run was skipped because another run held the lock are
+        retried after BUSY_RETRY_SECONDS rather than a full interval.
+        SIGINT/SIGTERM finish the current cycle and exit.
+
+        Args:
+            intervals: Mapping of scraper class name to seconds between runs
+                (default: DEFAULT_INTERVALS)
+            default_interval: Seconds for sources missing from ``intervals``
+            jitter: Random fraction added to each interval to avoid bursts
+            metrics_port: Optional port serving Prometheus /metrics
+        """
+        self.incremental = True
+        disabled = [name for name, enabled in (('keep_history', self.keep_history),
+                                               ('dedup', self.dedup)) if enabled]
+        if disabled:
+            self.logger.warning(f"Daemon mode is incremental; disabling {', '.join(disabled)}")
+            self.keep_history = False
+            self.dedup = False
+        if self.aggregator is not None and self.aggregator.fingerprints is None:
+            self.aggregator = None
+        intervals = dict(DEFAULT_INTERVALS if intervals is None else intervals)
+        aggregator = self._get_aggregator()
+        names = [s.__class__.__name__ for s in aggregator.scrapers]
+        next_due = {name: time.monotonic() for name in names}
+
+        if metrics_port is not None:
+            self.metrics.serve(metrics_port)
+            self.logger.info(f"Serving metrics on port {metrics_port}")
+
+        if threading.current_thread() is threading.main_thread():
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                signal.signal(sig, lambda signum, frame: self.stop())
+
+        self.logger.info(f"Scheduler daemon started for {', '.join(names)}")
+        while not self._stop.is_set():
+            now = time.monotonic()
+            due = [name for name in names if next_due[name] <= now]
+            if due:
+                ran = self.execute(sources=due)
+                for name in due:
+                    if ran:
+                        interval = intervals.get(name, default_interval)
+                        delay = interval * (1 + random.uniform(0, jitter))
+                    else:
+                        delay = BUSY_RETRY_SECONDS
+                    next_due[name] = time.monotonic() + delay
+                continue
+            self._stop.wait(max(0.0, min(next_due.values()) - time.monotonic()))
+
+        if self.metrics is not None and metrics_port is not None:
+            self.metrics.stop_serving()
+        self.logger.info("Scheduler daemon stopped")
+
+    def stop(self):
+        """Ask the daemon loop to exit after the current cycle."""
+        self._stop.set()
+
+    def write_metrics(self):
+        """Write collected metrics as a Prometheus textfile (output/metrics.prom)."""
+        if self.metrics is None:
+            return
+        output_dir = Path(self.output_dir) if self.output_dir else Path(__file__).parent / "output"
+        try:
+            self.metrics.write_textfile(output_dir / "metrics.prom")
+        except Exception as e:
+            self.logger.error(f"Error writing metrics: {str(e)}")
+
+
+def _parse_interval(value):
+    name, _, seconds = value.partition('=')
+    if not seconds:
+        raise argparse.ArgumentTypeError("expected SOURCE=SECONDS")
+    return name, float(seconds)
 
 
 if __name__ == "__main__":
-    scheduler = JobMarketScheduler()
-    scheduler.execute()
+    parser = argparse.ArgumentParser(description="Job market scraping pipeline")
+    parser.add_argument('--daemon', action='store_true', help='keep running with per-source cadences')
+    parser.add_argument('--interval', action='append', type=_parse_interval, default=[],
+                        metavar='SOURCE=SECONDS', help='override the cadence of one source')
+    parser.add_argument('--default-interval', type=float, default=86400)
+    parser.add_argument('--jitter', type=float, default=0.1)
+    parser.add_argument('--metrics-port', type=int)
+    parser.add_argument('--incremental', action='store_true')
+    parser.add_argument('--flat-output', action='store_true',
+                        help='overwrite output/jobs.jsonl and skill_trends.csv instead of keeping runs')
+    parser.add_argument('--retention-days', type=int, help='drop stored runs older than this')
+    parser.add_argument('--record-format', choices=('jsonl', 'frames'), default='jsonl',
+                        help='export format read back by analytics')
+    parser.add_argument('--dedup', action='store_true',
+                        help='merge near-duplicate postings across sources before export '
+                             '(not available with --daemon or --incremental)')
+    args = parser.parse_args()
+
+    scheduler = JobMarketScheduler(incremental=args.incremental, partitioned=not args.flat_output,
+                                   retention_days=args.retention_days,
+                                   record_format=args.record_format, dedup=args.dedup)
+    if args.daemon:
+        intervals = {**DEFAULT_INTERVALS, **dict(args.interval)}
+        scheduler.run_forever(intervals, args.default_interval, args.jitter, args.metrics_port)
+    else:
+        scheduler.execute()